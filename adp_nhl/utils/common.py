@@ -5,36 +5,149 @@ Common utilities shared across ADP NHL modules
 
 import os
 import re
+import glob
 import time
+import threading
 import requests
-from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import datetime, timedelta
+from functools import lru_cache
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
 
 # ---------------------------- Normalization ----------------------------
+_RE_DASH = re.compile(r"[\u2013\u2014\u2019]")
+_RE_PUNCT = re.compile(r"[^A-Za-z0-9\-\' ]+")
+_RE_SPACE = re.compile(r"\s+")
+
 def norm_name(s: str) -> str:
     """
     Normalize player names for consistent matching across sources.
     - Strips accents, punctuation, and casing
     - Converts Last, First -> First Last
+    Results are memoized; the same names recur across NST, DK and lines.
     """
     if not isinstance(s, str):
         return ""
-    s = re.sub(r"[\u2013\u2014\u2019]", "-", str(s))
-    s = re.sub(r"[^A-Za-z0-9\-\' ]+", " ", s)
-    s = re.sub(r"\s+", " ", s).strip().upper()
+    return _norm_name_cached(s)
+
+@lru_cache(maxsize=8192)
+def _norm_name_cached(s: str) -> str:
+    s = _RE_DASH.sub("-", s)
+    s = _RE_PUNCT.sub(" ", s)
+    s = _RE_SPACE.sub(" ", s).strip().upper()
     if "," in s:
         parts = [p.strip() for p in s.split(",")]
         if len(parts) == 2:
             s = f"{parts[1]} {parts[0]}".strip()
     return s
 
+# ---------------------------- Rate limiting ----------------------------
+_HOST_LOCKS = {}
+_HOST_LAST = {}
+_HOST_GUARD = threading.Lock()
+
+def throttle(url, min_interval):
+    """
+    Block until at least min_interval seconds have passed since the last
+    request to the same host. Thread-safe, so parallel per-team fetches
+    still hit each site at the old sequential cadence.
+    """
+    host = urlparse(url).netloc
+    with _HOST_GUARD:
+        lock = _HOST_LOCKS.setdefault(host, threading.Lock())
+    with lock:
+        wait = _HOST_LAST.get(host, 0.0) + min_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _HOST_LAST[host] = time.monotonic()
+
+# ---------------------------- HTTP Session ----------------------------
+USER_AGENT = "Mozilla/5.0 (ADP Free Model)"
+# Longest wait a Retry-After header can impose on one 429 in http_get_cached
+MAX_RETRY_AFTER = 60
+
+class _CappedRetry(Retry):
+    """Retry whose Retry-After waits are capped at backoff_max."""
+
+    def get_retry_after(self, response):
+        seconds = super().get_retry_after(response)
+        if seconds is None:
+            return None
+        return min(seconds, self.backoff_max)
+
+def make_session(pool_size=32, retries=3):
+    """
+    requests.Session with keep-alive pooling and transport-level retries
+    (connection errors, 429 and 5xx). A Retry-After header on 429/503 is
+    honored up to 10s; otherwise the backoff is exponential, capped at
+    10s. The User-Agent is set once here, so callers only pass the
+    headers that vary per request.
+    """
+    retry = _CappedRetry(
+        total=retries,
+        backoff_factor=1.0,
+        backoff_max=10,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+# Shared by the scrapers so TCP/TLS connections are reused across requests
+SESSION = make_session()
+
+def retry_after_seconds(response, default):
+    """Seconds requested by a Retry-After header (delta or HTTP date), else default."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    return max(0.0, (when - datetime.now(when.tzinfo)).total_seconds())
+
 # ---------------------------- HTTP Cache ----------------------------
+# Completed seasons don't change, so their pages are reused for a month
+# rather than refetched every day
+COMPLETED_SEASON_CACHE_DAYS = 30
+
+def recent_cache_file(cache_dir, tag, ext, max_age_days):
+    """
+    Newest day-stamped <tag>_YYYYMMDD.<ext> in cache_dir no older than
+    max_age_days, or None. max_age_days=0 only matches today's file;
+    max_age_days=None matches the newest file of any age.
+    """
+    paths = sorted(glob.glob(os.path.join(cache_dir, f"{glob.escape(tag)}_{'[0-9]' * 8}.{ext}")))
+    if not paths:
+        return None
+    newest = paths[-1]
+    if max_age_days is None:
+        return newest
+    oldest = (datetime.today() - timedelta(days=max_age_days)).strftime("%Y%m%d")
+    stamp = os.path.basename(newest)[len(tag) + 1:len(tag) + 9]
+    return newest if stamp >= oldest else None
+
 def http_get_cached(url, tag, cache_dir="data/raw", sleep=2, retries=5, headers=None):
     """
     Fetch HTML/JSON from URL with local caching.
     - Caches to data/raw/{tag}_{YYYYMMDD}.html
-    - Retries on rate limiting (429)
+    - SESSION already retries 429/5xx and connection errors; a 429 that
+      outlasts those retries waits for Retry-After (or 5s, doubling),
+      at most 60s, before trying again. Any other failure returns None.
     """
-    headers = headers or {"User-Agent": "Mozilla/5.0 (ADP Free Model)"}
     today = datetime.today().strftime("%Y%m%d")
     cache_file = os.path.join(cache_dir, f"{tag}_{today}.html")
 
@@ -46,10 +159,12 @@ def http_get_cached(url, tag, cache_dir="data/raw", sleep=2, retries=5, headers=
     tries = 0
     while tries < retries:
         try:
-            r = requests.get(url, headers=headers, timeout=60)
+            throttle(url, sleep)
+            r = SESSION.get(url, headers=headers, timeout=60)
             if r.status_code == 429:
-                print("⚠️ Rate limited. Sleeping 60s...")
-                time.sleep(60)
+                wait = min(MAX_RETRY_AFTER, retry_after_seconds(r, 5 * 2 ** tries))
+                print(f"⚠️ Rate limited. Sleeping {wait:.0f}s...")
+                time.sleep(wait)
                 tries += 1
                 continue
             r.raise_for_status()
@@ -57,10 +172,39 @@ def http_get_cached(url, tag, cache_dir="data/raw", sleep=2, retries=5, headers=
             os.makedirs(cache_dir, exist_ok=True)
             with open(cache_file, "w", encoding="utf-8") as f:
                 f.write(html)
-            time.sleep(sleep)
             return html
         except Exception as e:
             print(f"❌ Fetch error for {url} ({tag}): {e}")
-            time.sleep(10)
-            tries += 1
+            return None
     return None
+
+# ---------------------------- Snapshots ----------------------------
+def save_snapshot(df, name, data_dir="data"):
+    """
+    Write an intermediate scrape to <data_dir>/<name>.parquet (zstd, typed).
+    The CSV copy is only kept when ADP_CSV is set (CI sets it so the
+    committed/uploaded CSVs keep updating).
+    """
+    if os.environ.get("ADP_CSV", "").strip().lower() in ("1", "true", "yes"):
+        df.to_csv(os.path.join(data_dir, name + ".csv"), index=False)
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(table, os.path.join(data_dir, name + ".parquet"), compression="zstd")
+    except Exception as e:
+        print(f"⚠️ Parquet write failed for {name}: {e}")
+        df.to_csv(os.path.join(data_dir, name + ".csv"), index=False)
+
+# ---------------------------- Export values ----------------------------
+def float32_as_float64(df):
+    """
+    Widen float32 columns to float64 through their shortest repr, so a
+    cell stored as 12.672 is exported as 12.672 and not 12.67199993133545.
+    Other columns are returned untouched.
+    """
+    f32_cols = df.select_dtypes(include=["float32"]).columns
+    if not len(f32_cols):
+        return df
+    return df.assign(**{c: df[c].astype(str).astype("float64") for c in f32_cols})
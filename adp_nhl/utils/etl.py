@@ -22,15 +22,18 @@ PLAYERS_PARQ = DATA_PROCESSED / "players_2024_25.parquet"
 
 BASELINE_SEASON_INT = 2024  # represents 2024–25 season
 
-def _read_csv(name: str) -> pd.DataFrame:
+def _read_csv(name: str, dtype=None) -> pd.DataFrame:
     """
     Read a CSV from data/raw/ with some defaults.
+    Single C-parser pass (low_memory=False). Not the pyarrow engine: it
+    keeps duplicate headers (teams.csv repeats "team"; C renames it
+    "team.1") and reads the 21-digit lineId values as float64.
     Raises FileNotFoundError if missing.
     """
     p = DATA_RAW / name
     if not p.exists():
         raise FileNotFoundError(f"Missing raw file: {p}")
-    return pd.read_csv(p, low_memory=False)
+    return pd.read_csv(p, engine="c", low_memory=False, dtype=dtype)
 
 def ingest_baseline() -> dict:
     """
@@ -43,7 +46,9 @@ def ingest_baseline() -> dict:
 
     # ---------------------------- Load raw CSVs ----------------------------
     teams   = _read_csv("teams.csv")
-    lines   = _read_csv("lines.csv")
+    # lineId values are 21 digits: too wide for int64 (parquet can't
+    # store them) and lossy as float64, so keep them as text
+    lines   = _read_csv("lines.csv", dtype={"lineId": str})
     goalies = _read_csv("goalies.csv")
     skaters = _read_csv("skaters.csv")
 
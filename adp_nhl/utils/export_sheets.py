@@ -1,5 +1,19 @@
-import os, json, gspread
-from oauth2client.service_account import ServiceAccountCredentials
+import os, json
+from adp_nhl.utils.common import float32_as_float64
+
+def _sheet_values(df):
+    """
+    Rows as native Python values, so numbers land in Sheets as numbers
+    (not text); missing/inf cells become "", datetimes become strings.
+    float32 columns go through their shortest repr first, so 12.672 is
+    sent as 12.672 rather than 12.67199993133545.
+    """
+    df = float32_as_float64(df)
+    dt_cols = df.select_dtypes(include=["datetime", "datetimetz", "timedelta"]).columns
+    if len(dt_cols):
+        df = df.assign(**{c: df[c].astype(str).where(df[c].notna(), "") for c in dt_cols})
+    blank = df.isna() | df.isin([float("inf"), float("-inf")])
+    return df.astype(object).where(~blank, "").values.tolist()
 
 def upload_to_sheets(sheet_name, tabs_dict):
     """
@@ -10,6 +24,11 @@ def upload_to_sheets(sheet_name, tabs_dict):
     if not creds_json:
         raise RuntimeError("❌ Missing GCP_CREDENTIALS secret in environment.")
 
+    # Imported here: gspread/oauth2client are slow to load and only needed
+    # when an upload actually happens
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+
     creds_dict = json.loads(creds_json)
 
     scope = ["https://spreadsheets.google.com/feeds",
@@ -20,18 +39,31 @@ def upload_to_sheets(sheet_name, tabs_dict):
     # Open the target sheet (must already exist & be shared with the service account email)
     sh = client.open(sheet_name)
 
+    # One metadata call for existing tabs; the missing ones are all
+    # created in a single batchUpdate, sized to fit their frame
+    existing = {ws.title for ws in sh.worksheets()}
+    add_requests = []
     for tab_name, df in tabs_dict.items():
-        try:
-            ws = sh.worksheet(tab_name)
-        except gspread.exceptions.WorksheetNotFound:
-            ws = sh.add_worksheet(title=tab_name, rows="2000", cols="50")
+        if tab_name in existing:
+            continue
+        rows, cols = (0, 0) if df is None else df.shape
+        grid = {"rowCount": max(2000, rows + 1), "columnCount": max(50, cols)}
+        add_requests.append(
+            {"addSheet": {"properties": {"title": tab_name, "gridProperties": grid}}}
+        )
+    if add_requests:
+        sh.batch_update({"requests": add_requests})
 
-        ws.clear()
+    data = []
+    for tab_name, df in tabs_dict.items():
         if df is None or df.empty:
-            ws.update([["(no rows)"]])
+            values = [["(no rows)"]]
         else:
-            # Convert DataFrame into list of lists for upload
-            values = [df.columns.tolist()] + df.fillna("").astype(str).values.tolist()
-            ws.update(values)
+            values = [[str(c) for c in df.columns]] + _sheet_values(df)
+        data.append({"range": f"'{tab_name}'!A1", "values": values})
+
+    # Clear and write every tab in two batch requests instead of two per tab
+    sh.values_batch_clear(body={"ranges": [f"'{t}'" for t in tabs_dict]})
+    sh.values_batch_update(body={"valueInputOption": "RAW", "data": data})
 
     print(f"✅ Exported projections to Google Sheets ({sheet_name})")
@@ -27,8 +27,6 @@ def join_lineups_with_baseline(lineups_json: dict):
     Returns:
         DataFrame: merged lineups with baseline stats (where available).
     """
-    skaters, goalies, _, _, players = load_processed()
-
     # Flatten lineup JSON -> DataFrame
     if not lineups_json or "data" not in lineups_json:
         return pd.DataFrame()
@@ -39,8 +37,10 @@ def join_lineups_with_baseline(lineups_json: dict):
 
     df_lineups = pd.json_normalize(lineup_data)
 
-    # Merge with baseline skaters on playerId if present
+    # Merge with baseline skaters on playerId if present. Only the skater
+    # table is needed, so skip load_processed() and its four other reads.
     if "playerId" in df_lineups.columns:
+        skaters = pd.read_parquet(DATA_PROCESSED / "skater_stats_2024_25.parquet")
         merged = df_lineups.merge(
             skaters, on="playerId", how="left", suffixes=("", "_baseline")
         )
@@ -1,8 +1,24 @@
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import json
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable
+
+from adp_nhl.utils.common import make_session
+
+# orjson parses/dumps the lineup payloads in C when installed; stdlib otherwise
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode("utf-8")
 
 ROOT = Path(__file__).resolve().parents[2]
 DATA_PROCESSED = ROOT / "data" / "processed"
@@ -10,6 +26,10 @@ CACHE_DIR = DATA_PROCESSED / "cache"
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 BASE_URL = "https://vhd27npae1.execute-api.us-east-1.amazonaws.com/lineups"
+MAX_WORKERS = 16
+
+# Shared keep-alive session; pool sized for the per-team fan-out below
+SESSION = make_session(pool_size=MAX_WORKERS)
 
 def _etag_file(team: Optional[str]) -> Path:
     key = "ALL" if team is None else team.upper()
@@ -19,6 +39,10 @@ def _last_file(team: Optional[str]) -> Path:
     key = "ALL" if team is None else team.upper()
     return CACHE_DIR / f"lineups_{key}_last.txt"
 
+def _payload_file(team: Optional[str]) -> Path:
+    key = "ALL" if team is None else team.upper()
+    return CACHE_DIR / f"lineups_{key}_latest.json"
+
 def _read_text(path: Path) -> Optional[str]:
     try:
         return path.read_text().strip()
@@ -32,7 +56,8 @@ def _write_text(path: Path, text: str):
 def fetch_lineups(team: Optional[str] = None, use_cache: bool = True) -> Dict[str, Any]:
     """
     Fetch daily lineups (all teams or one team).
-    - Respects ETag to avoid re-downloading unchanged data.
+    - Respects ETag to avoid re-downloading unchanged data; a 304 is
+      answered from the last saved payload (status "not_modified").
     - Safe to run once each morning.
     """
     url = BASE_URL if team is None else f"{BASE_URL}/{team.upper()}"
@@ -43,25 +68,33 @@ def fetch_lineups(team: Optional[str] = None, use_cache: bool = True) -> Dict[st
         if etag:
             headers["If-None-Match"] = etag
 
-    resp = requests.get(url, timeout=20, headers=headers)
+    resp = SESSION.get(url, timeout=20, headers=headers)
 
     if resp.status_code == 304:
         last = _read_text(_last_file(team)) or "unknown"
-        return {"status": "not_modified", "url": url, "last_fetch": last}
+        out = {"status": "not_modified", "url": url, "last_fetch": last}
+        try:
+            data = _loads(_payload_file(team).read_bytes())
+        except (FileNotFoundError, ValueError):
+            return out
+        out["count"] = len(data) if isinstance(data, list) else 1
+        out["data"] = data
+        return out
 
     resp.raise_for_status()
-    data = resp.json()
+    data = _loads(resp.content)
 
     # Save cache headers
     etag = resp.headers.get("ETag")
     if etag:
+        _payload_file(team).write_bytes(resp.content)
         _write_text(_etag_file(team), etag)
     _write_text(_last_file(team), datetime.utcnow().isoformat())
 
     # Save raw JSON for reference
     stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
     out_file = DATA_PROCESSED / f"lineups_{team or 'ALL'}_{stamp}.json"
-    out_file.write_text(json.dumps(data, indent=2))
+    out_file.write_bytes(_dumps(data))
 
     return {
         "status": "ok",
@@ -69,3 +102,23 @@ def fetch_lineups(team: Optional[str] = None, use_cache: bool = True) -> Dict[st
         "count": len(data) if isinstance(data, list) else 1,
         "data": data,
     }
+
+def fetch_lineups_many(teams: Iterable[str], use_cache: bool = True) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch lineups for several teams concurrently (I/O bound, one request each).
+    Team codes are upper-cased and de-duplicated first, so a repeated team
+    is fetched once instead of racing on its own ETag/cache files.
+    Returns {TEAM: fetch_lineups result}; a failed team maps to
+    {"status": "error", "error": "..."} instead of aborting the batch.
+    """
+    def fetch(team):
+        try:
+            return team, fetch_lineups(team, use_cache=use_cache)
+        except Exception as e:
+            return team, {"status": "error", "error": str(e)}
+
+    teams = list(dict.fromkeys(str(t).upper() for t in teams))
+    if not teams:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(teams))) as ex:
+        return dict(ex.map(fetch, teams))
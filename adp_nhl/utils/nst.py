@@ -1,41 +1,104 @@
-import os, re, time, requests
+import os, re
+import numpy as np
 import pandas as pd
+from io import StringIO
+from lxml import html as lxml_html
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from adp_nhl.utils.common import (
+    COMPLETED_SEASON_CACHE_DAYS, SESSION, recent_cache_file, save_snapshot, throttle,
+)
+# Fallback values, the team fallback map and the regex fallbacks are
+# shared with the scraper
+from adp_nhl.utils.nst_scraper import (
+    FALLBACK_CA60, FALLBACK_SF60, FALLBACK_xGA60, FALLBACK_xGF60, TEAM_FALLBACKS,
+    _PLAYER_LABEL_RES, _RE_PLAYER_LINK, _RE_ROW, _RE_SV, _RE_TEAM_LINK,
+)
 
 # Config
 DATA_DIR = "data"
 RAW_DIR = os.path.join(DATA_DIR, "raw")
 os.makedirs(RAW_DIR, exist_ok=True)
 
-HEADERS = {"User-Agent": "Mozilla/5.0 (ADP Free Model)"}
 TIMEOUT = 60
+MAX_WORKERS = 4  # concurrent NST page fetches
 LEAGUE_AVG_SV = 0.905
 
-# Fall back values if NST fails
-FALLBACK_CA60  = 58.0
-FALLBACK_xGA60 = 2.65
-FALLBACK_SF60  = 31.0
-FALLBACK_xGF60 = 2.95
-
 # --- Simple cache fetch ---
-def http_get_cached(url, tag, sleep=3):
+def http_get_cached(url, tag, sleep=3, max_age_days=0):
+    """Day-stamped HTML cache; max_age_days > 0 also reuses older copies."""
     today = datetime.today().strftime("%Y%m%d")
     cache_file = os.path.join(RAW_DIR, f"{tag}_{today}.html")
-    if os.path.exists(cache_file):
-        with open(cache_file, "r", encoding="utf-8") as f:
+    cached = recent_cache_file(RAW_DIR, tag, "html", max_age_days)
+    if cached:
+        with open(cached, "r", encoding="utf-8") as f:
             return f.read()
     try:
-        r = requests.get(url, headers=HEADERS, timeout=TIMEOUT)
+        throttle(url, sleep)
+        r = SESSION.get(url, timeout=TIMEOUT)
         r.raise_for_status()
         html = r.text
         with open(cache_file, "w", encoding="utf-8") as f:
             f.write(html)
-        time.sleep(sleep)
         return html
     except Exception as e:
         print(f"❌ Fetch error {tag}:", e)
         return None
 
+TEAM_RATE_COLS = ["CF/60","CA/60","SF/60","xGF/60","xGA/60"]
+
+# NST header variants for the skater rate columns we keep
+PLAYER_RATE_COLS = {
+    "G/60":    ["G/60", "Goals/60"],
+    "A/60":    ["A/60", "Total Assists/60"],
+    "SOG/60":  ["S/60", "SOG/60", "Shots/60"],
+    "BLK/60":  ["Blk/60", "BLK/60", "Shots Blocked/60"],
+    "CF/60":   ["CF/60"],
+    "xGF/60":  ["xGF/60"],
+    "HDCF/60": ["HDCF/60"],
+}
+
+# --- Precompiled patterns (regex fallbacks) ---
+# Team rates here only accept decimals (e.g. "58.0"), unlike the scraper's
+# pattern, so this one stays local
+_TEAM_LABEL_RES = {
+    label: re.compile(rf"{label}[^0-9]*([0-9]+\.[0-9]+)", re.IGNORECASE)
+    for label in TEAM_RATE_COLS
+}
+
+# --- Table parsing ---
+def _read_tables(html, **kwargs):
+    """All <table>s in the page as DataFrames (one lxml pass), or [] on failure."""
+    try:
+        return pd.read_html(StringIO(html), flavor="lxml", **kwargs)
+    except Exception:
+        return []
+
+def _lower_cols(df):
+    return {str(c).strip().lower(): c for c in df.columns}
+
+def _team_table_to_df(t):
+    """Team abbr from the teamreport link, per-60 columns coerced to float."""
+    cols = _lower_cols(t)
+    if "team" not in cols:
+        return pd.DataFrame()
+    links = t[cols["team"]].str[1].astype(str)
+    df = pd.DataFrame({"Team": links.str.extract(r"team=([A-Z]{2,3})", expand=False)})
+    for col in TEAM_RATE_COLS:
+        src = cols.get(col.lower())
+        df[col] = pd.to_numeric(t[src].str[0], errors="coerce") if src is not None else float("nan")
+    df = df.dropna(subset=["Team"]).reset_index(drop=True)
+    return df.fillna(TEAM_FALLBACKS)
+
+def _player_table_to_df(t):
+    """PlayerRaw + per-60 columns from an NST playerteams table."""
+    cols = _lower_cols(t)
+    df = pd.DataFrame({"PlayerRaw": t[cols["player"]].astype(str).str.strip()})
+    for col, opts in PLAYER_RATE_COLS.items():
+        src = next((cols[o.lower()] for o in opts if o.lower() in cols), None)
+        df[col] = pd.to_numeric(t[src], errors="coerce") if src is not None else float("nan")
+    return df
+
 # --- Team Stats ---
 def get_team_stats(season):
     url = f"https://www.naturalstattrick.com/teamtable.php?fromseason={season}&thruseason={season}&stype=2&sit=all"
@@ -43,17 +106,26 @@ def get_team_stats(season):
     if html is None:
         print("⚠️ NST team stats unavailable; using league fallbacks.")
         return pd.DataFrame(columns=["Team","CF/60","CA/60","SF/60","xGF/60","xGA/60"])
+
+    # Fast path: one C-level parse of the whole table (links kept for Team abbr)
+    for t in _read_tables(html, extract_links="body"):
+        df = _team_table_to_df(t)
+        if not df.empty:
+            save_snapshot(df, "team_stats", DATA_DIR)
+            return df
+
+    # Fallback: per-row regex scrape
     try:
-        rows = re.findall(r"<tr[^>]*>(.*?)</tr>", html, flags=re.DOTALL|re.IGNORECASE)
+        rows = _RE_ROW.findall(html)
         out = []
         for row in rows:
-            m = re.search(r'teamreport\.php\?team=([A-Z]{2,3})', row)
+            m = _RE_TEAM_LINK.search(row)
             if not m: 
                 continue
             abbr = m.group(1)
 
             def num(label, fallback=None):
-                m2 = re.search(rf"{label}[^0-9]*([0-9]+\.[0-9]+)", row, flags=re.IGNORECASE)
+                m2 = _TEAM_LABEL_RES[label].search(row)
                 return float(m2.group(1)) if m2 else fallback
 
             out.append({
@@ -65,30 +137,76 @@ def get_team_stats(season):
                 "xGA/60": num("xGA/60") or FALLBACK_xGA60,
             })
         df = pd.DataFrame(out)
-        df.to_csv(os.path.join(DATA_DIR, "team_stats.csv"), index=False)
+        save_snapshot(df, "team_stats", DATA_DIR)
         return df
     except Exception as e:
         print("❌ Parse NST team stats failed:", e)
         return pd.DataFrame(columns=["Team","CF/60","CA/60","SF/60","xGF/60","xGA/60"])
 
 # --- Player Stats (Skaters) ---
+def _cell_float(cells, i):
+    if i is None or i >= len(cells):
+        return np.nan
+    try:
+        return float(cells[i].text_content().strip())
+    except ValueError:
+        return np.nan
+
+def _walk_player_table(html):
+    """
+    One lxml tree walk for tables read_html can't frame (e.g. a header row
+    of <td>s): the first row with a "Player" cell is the header, and every
+    later row is read by column position. None if no such table exists.
+    """
+    try:
+        tree = lxml_html.fromstring(html)
+    except Exception:
+        return None
+    for table in tree.iter("table"):
+        rows = table.xpath(".//tr")
+        for h, tr in enumerate(rows):
+            header = [c.text_content().strip().lower() for c in tr.xpath("./th|./td")]
+            if "player" in header:
+                break
+        else:
+            continue
+        idx = {name: i for i, name in enumerate(header)}
+        player_i = idx["player"]
+        rate_i = {col: next((idx[o.lower()] for o in opts if o.lower() in idx), None)
+                  for col, opts in PLAYER_RATE_COLS.items()}
+        out = []
+        for tr in rows[h + 1:]:
+            cells = tr.xpath("./td")
+            if len(cells) <= player_i:
+                continue
+            rec = {"PlayerRaw": cells[player_i].text_content().strip()}
+            rec.update({col: _cell_float(cells, i) for col, i in rate_i.items()})
+            out.append(rec)
+        if out:
+            return pd.DataFrame(out)
+    return None
+
 def _parse_nst_player_rows(html):
-    rows = re.findall(r"<tr[^>]*>(.*?)</tr>", html, flags=re.IGNORECASE|re.DOTALL)
+    for t in _read_tables(html):
+        if "player" in _lower_cols(t):
+            return _player_table_to_df(t)
+
+    df = _walk_player_table(html)
+    if df is not None:
+        return df
+
+    # Last resort when no table has a Player header: per-row regex scrape
+    rows = _RE_ROW.findall(html)
     out = []
     for row in rows:
-        m_name = re.search(r'player(?:\.php\?id=|id=)\d+[^>]*>([^<]+)</a>', row, flags=re.IGNORECASE)
+        m_name = _RE_PLAYER_LINK.search(row)
         if not m_name:
             continue
         pname = m_name.group(1).strip()
 
         def pick_num(label):
-            pats = [
-                rf'{label}\s*/\s*60[^0-9\-]*([0-9]*\.?[0-9]+)',
-                rf'{label}60[^0-9\-]*([0-9]*\.?[0-9]+)',
-                rf'{label}[^0-9\-]*([0-9]*\.?[0-9]+)'
-            ]
-            for pat in pats:
-                m = re.search(pat, row, flags=re.IGNORECASE)
+            for pat in _PLAYER_LABEL_RES[label]:
+                m = pat.search(row)
                 if m:
                     try: return float(m.group(1))
                     except: pass
@@ -108,13 +226,13 @@ def _parse_nst_player_rows(html):
         })
     return pd.DataFrame(out)
 
-def get_team_players(team_code, season_code, tgp=None):
+def get_team_players(team_code, season_code, tgp=None, max_age_days=0):
     qs = f"team={team_code}&sit=all&fromseason={season_code}&thruseason={season_code}"
     if tgp:
         qs += f"&tgp={tgp}"
     url = f"https://www.naturalstattrick.com/playerteams.php?{qs}"
     tag = f"nst_players_{team_code}_{season_code}_{tgp or 'all'}"
-    html = http_get_cached(url, tag=tag)
+    html = http_get_cached(url, tag=tag, max_age_days=max_age_days)
     if html is None:
         return pd.DataFrame()
     return _parse_nst_player_rows(html)
@@ -124,36 +242,43 @@ def get_goalies(season, last_season=None):
     if not last_season:
         last_season = str(int(season[:4]) - 1) + str(int(season[:4]))
 
-    def fetch_goalie_stats(season, tgp=None):
+    def fetch_goalie_stats(season, tgp=None, max_age_days=0):
         qs = f"fromseason={season}&thruseason={season}&sit=all&playerstype=goalies"
         if tgp:
             qs += f"&tgp={tgp}"
         url = f"https://www.naturalstattrick.com/playerteams.php?{qs}"
         tag = f"nst_goalies_{season}_{tgp or 'all'}"
-        html = http_get_cached(url, tag=tag, sleep=3)
+        html = http_get_cached(url, tag=tag, sleep=3, max_age_days=max_age_days)
         if html is None:
             return pd.DataFrame()
 
-        rows = re.findall(r"<tr[^>]*>(.*?)</tr>", html, flags=re.IGNORECASE|re.DOTALL)
+        rows = _RE_ROW.findall(html)
         out = []
         for row in rows:
-            m_name = re.search(r'player(?:\.php\?id=|id=)\d+[^>]*>([^<]+)</a>', row, flags=re.IGNORECASE)
+            m_name = _RE_PLAYER_LINK.search(row)
             if not m_name:
                 continue
             pname = m_name.group(1).strip()
-            sv_match = re.search(r'SV%[^0-9]*([0-9]*\.?[0-9]+)', row, flags=re.IGNORECASE)
+            sv_match = _RE_SV.search(row)
             sv_pct = float(sv_match.group(1))/100.0 if sv_match else None
             out.append({"PlayerRaw": pname, "SV%": sv_pct})
         return pd.DataFrame(out)
 
-    season_df = fetch_goalie_stats(season).rename(columns={"SV%":"SV_season"})
-    recent_df = fetch_goalie_stats(season, tgp=10).rename(columns={"SV%":"SV_recent"})
-    last_df   = fetch_goalie_stats(last_season).rename(columns={"SV%":"SV_last"})
+    # The three split pages are independent; fetch them side by side
+    # (throttle() still paces requests to NST)
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        season_f = ex.submit(fetch_goalie_stats, season)
+        recent_f = ex.submit(fetch_goalie_stats, season, tgp=10)
+        last_f   = ex.submit(fetch_goalie_stats, last_season,
+                             max_age_days=COMPLETED_SEASON_CACHE_DAYS)
+    season_df = season_f.result().rename(columns={"SV%":"SV_season"})
+    recent_df = recent_f.result().rename(columns={"SV%":"SV_recent"})
+    last_df   = last_f.result().rename(columns={"SV%":"SV_last"})
 
     merged = season_df.merge(recent_df, on="PlayerRaw", how="left")
     merged = merged.merge(last_df, on="PlayerRaw", how="left")
 
-    merged.to_csv(os.path.join(DATA_DIR, "goalie_stats.csv"), index=False)
+    save_snapshot(merged, "goalie_stats", DATA_DIR)
     return merged
 
 # --- Blending ---
@@ -167,33 +292,67 @@ def blend_three_layer(recent, season, last, w_recent=0.50, w_season=0.35, w_last
     if pd.notna(last):   num += w_last*last;     den += w_last
     return num/den if den>0 else None
 
+def blend_three_layer_cols(recent, season, last, w_recent=0.50, w_season=0.35, w_last=0.15):
+    """Column-wise blend_three_layer: NaN-masked weights renormalized per row."""
+    num = 0.0; den = 0.0
+    for vals, w in ((recent, w_recent), (season, w_season), (last, w_last)):
+        if vals is None:
+            continue
+        v = pd.to_numeric(vals, errors="coerce").to_numpy(dtype=float)
+        ok = ~np.isnan(v)
+        num = num + np.where(ok, w*v, 0.0)
+        den = den + np.where(ok, w, 0.0)
+    den = np.asarray(den, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(den > 0, num/den, np.nan)
+
 # --- Wrapper: Skater Multi Fetch ---
 def fetch_nst_player_stats_multi(teams, season, last_season=None):
     if not last_season:
         last_season = str(int(season[:4]) - 1) + str(int(season[:4]))
 
-    frames = []
+    # All (team, split) pages fetched concurrently; throttle() paces NST.
+    # Deduped first so a repeated team is neither refetched nor doubled.
+    teams = list(dict.fromkeys(teams))
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        jobs = {abbr: (ex.submit(get_team_players, abbr, season),
+                       ex.submit(get_team_players, abbr, season, tgp=10),
+                       ex.submit(get_team_players, abbr, last_season,
+                                 max_age_days=COMPLETED_SEASON_CACHE_DAYS))
+                for abbr in teams}
+
+    # Collect each split across teams, then merge and blend once for the
+    # whole league rather than once per team followed by a concat
+    season_parts, recent_parts, last_parts = [], [], []
     for abbr in teams:
-        season_df = get_team_players(abbr, season)
-        recent_df = get_team_players(abbr, season, tgp=10)
-        last_df   = get_team_players(abbr, last_season)
+        season_df, recent_df, last_df = (f.result() for f in jobs[abbr])
 
         if season_df.empty:
             continue
 
-        merged = season_df.merge(recent_df.add_suffix("_recent"), left_on="PlayerRaw", right_on="PlayerRaw_recent", how="left")
-        merged = merged.merge(last_df.add_suffix("_last"), left_on="PlayerRaw", right_on="PlayerRaw_last", how="left")
+        season_parts.append(season_df.assign(Team=abbr))
+        recent_parts.append(recent_df.add_suffix("_recent").assign(Team=abbr))
+        last_parts.append(last_df.add_suffix("_last").assign(Team=abbr))
+
+    if not season_parts:
+        out = pd.DataFrame()
+    else:
+        merged = pd.concat(season_parts, ignore_index=True)
+        for parts, suffix in ((recent_parts, "_recent"), (last_parts, "_last")):
+            other = pd.concat(parts, ignore_index=True)
+            key = "PlayerRaw" + suffix
+            if key not in other.columns:
+                other[key] = pd.Series(dtype=object)
+            merged = merged.merge(other, left_on=["Team", "PlayerRaw"], right_on=["Team", key], how="left")
 
         # Blended columns
         for col in ["G/60","A/60","SOG/60","BLK/60"]:
-            merged[f"B_{col}"] = merged.apply(
-                lambda r: blend_three_layer(r.get(f"{col}_recent"), r.get(col), r.get(f"{col}_last")),
-                axis=1
+            merged[f"B_{col}"] = blend_three_layer_cols(
+                merged.get(f"{col}_recent"), merged.get(col), merged.get(f"{col}_last")
             )
 
-        merged["Team"] = abbr
-        frames.append(merged)
+        # Team last, as the per-team version left it
+        out = merged[[c for c in merged.columns if c != "Team"] + ["Team"]]
 
-    out = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
-    out.to_csv(os.path.join(DATA_DIR, "nst_player_stats.csv"), index=False)
+    save_snapshot(out, "nst_player_stats", DATA_DIR)
     return out
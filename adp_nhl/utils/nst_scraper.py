@@ -7,23 +7,26 @@ NaturalStatTrick scraper utilities
 """
 
 import os
-import time
-import requests
 import pandas as pd
 import re
+import threading
 from io import StringIO
+from lxml import html as lxml_html
 from datetime import datetime
 from typing import Optional
-from adp_nhl.utils.common import norm_name
+from concurrent.futures import ThreadPoolExecutor
+from adp_nhl.utils.common import (
+    COMPLETED_SEASON_CACHE_DAYS, SESSION, norm_name, recent_cache_file, save_snapshot, throttle,
+)
 
 # ---- Config ----
 DATA_DIR = "data"
 RAW_DIR = os.path.join(DATA_DIR, "raw")
 os.makedirs(RAW_DIR, exist_ok=True)
 
-HEADERS = {"User-Agent": "Mozilla/5.0 (ADP Free Model)"}
 TIMEOUT = 30
-DEFAULT_SLEEP = 2.0
+DEFAULT_SLEEP = 2.0  # minimum seconds between requests to the same host
+MAX_WORKERS = 4     # concurrent per-team fetches
 
 # Fallbacks
 FALLBACK_CA60  = 58.0
@@ -31,46 +34,163 @@ FALLBACK_xGA60 = 2.65
 FALLBACK_SF60  = 31.0
 FALLBACK_xGF60 = 2.95
 LEAGUE_AVG_SV = 0.905
+TEAM_FALLBACKS = {"CA/60": FALLBACK_CA60, "SF/60": FALLBACK_SF60,
+                  "xGF/60": FALLBACK_xGF60, "xGA/60": FALLBACK_xGA60}
+
+# Column order of the tuples the regex/tree-walk fallbacks collect
+_TEAM_FALLBACK_COLS = ["Team", "CF/60", "CA/60", "SF/60", "xGF/60", "xGA/60"]
+_PLAYER_FALLBACK_COLS = ["PlayerRaw", "NormName", "G/60", "A/60", "SOG/60", "BLK/60",
+                         "CF/60", "xGF/60", "HDCF/60", "Team"]
+_LINE_COMBO_COLS = ["Team", "Players", "P1", "P2", "P3", "TOI", "CF", "CA", "xGF", "xGA"]
+
+# ---- Precompiled patterns (regex fallbacks) ----
+_RE_ROW = re.compile(r"<tr[^>]*>(.*?)</tr>", re.IGNORECASE | re.DOTALL)
+_RE_TEAM_LINK = re.compile(r"teamreport\.php\?team=([A-Z]{2,3})")
+_RE_PLAYER_LINK = re.compile(r"player(?:\.php\?id=|id=)\d+[^>]*>([^<]+)</a>", re.IGNORECASE)
+_RE_ANCHOR_TEXT = re.compile(r">([^<]+)</a>")
+_RE_TAGS = re.compile(r"<[^>]+>")
+_RE_NAME_SPLIT = re.compile(r"\s*[/\n,]\s*")
+_RE_NON_NUM = re.compile(r"[^\d\.\-]")
+_RE_NON_PCT = re.compile(r"[^\d\.]")
+_RE_SV = re.compile(r"SV%[^0-9]*([0-9]*\.?[0-9]+)", re.IGNORECASE)
+_TEAM_LABEL_RES = {
+    label: re.compile(rf"{label}[^0-9\-]*([0-9]*\.?[0-9]+)", re.IGNORECASE)
+    for label in ["CF/60", "CA/60", "SF/60", "xGF/60", "xGA/60"]
+}
+_PLAYER_LABEL_RES = {
+    label: [
+        re.compile(rf"{label}\s*/\s*60[^0-9\-]*([0-9]*\.?[0-9]+)", re.IGNORECASE),
+        re.compile(rf"{label}60[^0-9\-]*([0-9]*\.?[0-9]+)", re.IGNORECASE),
+        re.compile(rf"{label}[^0-9\-]*([0-9]*\.?[0-9]+)", re.IGNORECASE),
+    ]
+    for label in ["G", "A", "S", "Blk", "CF", "xGF", "HDCF"]
+}
 
 # ---- Internal helpers ----
+_LXML_LOCAL = threading.local()
+
+def _lxml_parser():
+    """
+    One lxml HTMLParser per worker thread, reused across team pages
+    (parser instances are not safe to share between threads).
+    """
+    parser = getattr(_LXML_LOCAL, "parser", None)
+    if parser is None:
+        parser = lxml_html.HTMLParser(encoding="utf-8", remove_comments=True)
+        _LXML_LOCAL.parser = parser
+    return parser
+
 def _cache_path(tag: str):
     today = datetime.today().strftime("%Y%m%d")
     return os.path.join(RAW_DIR, f"{tag}_{today}.html")
 
-def http_get_cached(url: str, tag: str, sleep: float = DEFAULT_SLEEP):
+def _validator_paths(tag: str):
+    return (os.path.join(RAW_DIR, f"{tag}.etag"),
+            os.path.join(RAW_DIR, f"{tag}.lastmod"))
+
+def _read_small(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except Exception:
+        return None
+
+def _write_small(path: str, text: Optional[str]):
+    if not text:
+        return
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    except Exception:
+        pass
+
+def http_get_cached(url: str, tag: str, sleep: float = DEFAULT_SLEEP, max_age_days: int = 0):
     """
     GET with simple day-based cache. Returns HTML string or None.
+    max_age_days > 0 also reuses a copy saved within that many days.
+    On a cold day, revalidates the last cached copy with If-None-Match /
+    If-Modified-Since so unchanged pages come back as an empty 304.
     """
     path = _cache_path(tag)
-    if os.path.exists(path):
+    cached = recent_cache_file(RAW_DIR, tag, "html", max_age_days)
+    if cached:
         try:
-            with open(path, "r", encoding="utf-8") as f:
+            with open(cached, "r", encoding="utf-8") as f:
                 return f.read()
         except Exception:
             pass
 
+    etag_path, lastmod_path = _validator_paths(tag)
+    latest = recent_cache_file(RAW_DIR, tag, "html", None)
+    headers = {}
+    if latest:
+        etag = _read_small(etag_path)
+        lastmod = _read_small(lastmod_path)
+        if etag:
+            headers["If-None-Match"] = etag
+        if lastmod:
+            headers["If-Modified-Since"] = lastmod
+
     try:
-        r = requests.get(url, headers=HEADERS, timeout=TIMEOUT)
-        r.raise_for_status()
-        html = r.text
+        throttle(url, sleep)
+        r = SESSION.get(url, headers=headers, timeout=TIMEOUT)
+        if r.status_code == 304 and latest:
+            with open(latest, "r", encoding="utf-8") as f:
+                html = f.read()
+        else:
+            r.raise_for_status()
+            html = r.text
+            _write_small(etag_path, r.headers.get("ETag"))
+            _write_small(lastmod_path, r.headers.get("Last-Modified"))
         try:
             with open(path, "w", encoding="utf-8") as f:
                 f.write(html)
         except Exception:
             pass
-        time.sleep(sleep)
         return html
     except Exception as e:
         print(f"❌ Fetch error {tag}: {e}")
         return None
 
-def _safe_read_html(html: str):
+def _parsed_cache_path(tag: str):
+    today = datetime.today().strftime("%Y%m%d")
+    return os.path.join(RAW_DIR, f"{tag}_{today}.parquet")
+
+def parsed_cache(url: str, tag: str, parser, sleep: float = DEFAULT_SLEEP,
+                 max_age_days: int = 0):
+    """
+    Day-based cache of *parsed* rows. A warm run is a single read_parquet;
+    a cold run fetches via http_get_cached, parses, and stores the result.
+    max_age_days > 0 also reuses rows parsed within that many days.
+    Returns the parsed DataFrame, or None if the page could not be fetched.
+    """
+    path = _parsed_cache_path(tag)
+    cached = recent_cache_file(RAW_DIR, tag, "parquet", max_age_days)
+    if cached:
+        try:
+            return pd.read_parquet(cached)
+        except Exception:
+            pass
+
+    html = http_get_cached(url, tag=tag, sleep=sleep, max_age_days=max_age_days)
+    if not html:
+        return None
+    df = parser(html)
+    if df is not None and not df.empty:
+        try:
+            df.to_parquet(path, index=False, compression="zstd")
+        except Exception:
+            pass
+    return df
+
+def _safe_read_html(html: str, **kwargs):
     """
     Wrapper around pd.read_html that uses StringIO to satisfy future warnings.
+    Extra kwargs (e.g. match=) are passed through.
     Returns list of dataframes or empty list.
     """
     try:
-        return pd.read_html(StringIO(html))
+        return pd.read_html(StringIO(html), flavor="lxml", **kwargs)
     except Exception:
         return []
 
@@ -83,13 +203,16 @@ def get_team_stats(season: str) -> pd.DataFrame:
     """
     url = f"https://www.naturalstattrick.com/teamtable.php?fromseason={season}&thruseason={season}&stype=2&sit=all"
     tag = f"nst_teamtable_{season}"
-    html = http_get_cached(url, tag=tag)
-    if not html:
+    df = parsed_cache(url, tag, _parse_team_stats_html)
+    if df is None:
         print("⚠️ NST team stats unavailable; returning empty DataFrame with expected columns.")
         return pd.DataFrame(columns=["Team","CF/60","CA/60","SF/60","xGF/60","xGA/60"])
+    return df
 
+def _parse_team_stats_html(html: str) -> pd.DataFrame:
     # Try to read table with pandas first. If it fails, fallback to regex parsing.
-    tables = _safe_read_html(html)
+    # match= skips building frames for tables without Corsi columns.
+    tables = _safe_read_html(html, match="CF")
     if tables:
         # find likely table by column names
         for t in tables:
@@ -127,40 +250,37 @@ def get_team_stats(season: str) -> pd.DataFrame:
                         df[c] = pd.NA
                 df = df[needed]
                 # coerce numeric
-                for c in ["CF/60","CA/60","SF/60","xGF/60","xGA/60"]:
-                    df[c] = pd.to_numeric(df[c], errors="coerce")
+                rate_cols = ["CF/60","CA/60","SF/60","xGF/60","xGA/60"]
+                df[rate_cols] = df[rate_cols].apply(pd.to_numeric, errors="coerce")
                 # fill fallback values where applicable
-                df["CA/60"] = df["CA/60"].fillna(FALLBACK_CA60)
-                df["SF/60"] = df["SF/60"].fillna(FALLBACK_SF60)
-                df["xGF/60"] = df["xGF/60"].fillna(FALLBACK_xGF60)
-                df["xGA/60"] = df["xGA/60"].fillna(FALLBACK_xGA60)
-                df.to_csv(os.path.join(DATA_DIR, "team_stats.csv"), index=False)
+                df = df.fillna(TEAM_FALLBACKS)
+                save_snapshot(df, "team_stats", DATA_DIR)
                 return df.reset_index(drop=True)
 
     # fallback regex parsing
     try:
-        rows = re.findall(r"<tr[^>]*>(.*?)</tr>", html, flags=re.DOTALL|re.IGNORECASE)
         out = []
-        for row in rows:
-            m = re.search(r'teamreport\.php\?team=([A-Z]{2,3})', row)
+        for m_row in _RE_ROW.finditer(html):
+            row = m_row.group(1)
+            m = _RE_TEAM_LINK.search(row)
             if not m:
                 continue
             abbr = m.group(1)
             def num(label, fallback=None):
-                m2 = re.search(rf"{label}[^0-9\-]*([0-9]*\.?[0-9]+)", row, flags=re.IGNORECASE)
+                m2 = _TEAM_LABEL_RES[label].search(row)
                 return float(m2.group(1)) if m2 else fallback
-            out.append({
-                "Team": abbr,
-                "CF/60":  num("CF/60"),
-                "CA/60":  num("CA/60")  or FALLBACK_CA60,
-                "SF/60":  num("SF/60")  or FALLBACK_SF60,
-                "xGF/60": num("xGF/60") or FALLBACK_xGF60,
-                "xGA/60": num("xGA/60") or FALLBACK_xGA60,
-            })
-        df = pd.DataFrame(out)
+            out.append((
+                abbr,
+                num("CF/60"),
+                num("CA/60")  or FALLBACK_CA60,
+                num("SF/60")  or FALLBACK_SF60,
+                num("xGF/60") or FALLBACK_xGF60,
+                num("xGA/60") or FALLBACK_xGA60,
+            ))
+        df = pd.DataFrame.from_records(out, columns=_TEAM_FALLBACK_COLS)
         if df.empty:
             raise ValueError("no team rows parsed")
-        df.to_csv(os.path.join(DATA_DIR, "team_stats.csv"), index=False)
+        save_snapshot(df, "team_stats", DATA_DIR)
         return df
     except Exception as e:
         print("❌ Parse NST team stats failed:", e)
@@ -172,7 +292,6 @@ def _parse_player_table_df(df: pd.DataFrame, team_code: Optional[str]=None) -> p
     Given a dataframe read from NST playerteams table, map/rename to expected columns.
     Returns DataFrame with PlayerRaw, NormName, G/60, A/60, SOG/60, BLK/60, CF/60, xGF/60, HDCF/60
     """
-    df = df.copy()
     # Merge columns heuristically
     cols = {c.lower(): c for c in df.columns}
     # find name column
@@ -198,30 +317,26 @@ def _parse_player_table_df(df: pd.DataFrame, team_code: Optional[str]=None) -> p
     cf_col = pick("cf/60","cf")
     xgf_col = pick("xgf/60","xgf")
     hdcf_col = pick("hdcf/60","hdcf")
-    out = []
-    for _, r in df.iterrows():
-        raw_name = str(r.get(name_col, "")).strip()
-        # strip HTML tags if present
-        raw_name = re.sub(r"<[^>]+>", "", raw_name)
-        nm = raw_name
-        # build row
-        def val(c):
-            return float(r[c]) if (c is not None and pd.notna(r.get(c))) else pd.NA
-        row = {
-            "PlayerRaw": nm,
-            "NormName": norm_name(nm),
-            "G/60": val(g_col),
-            "A/60": val(a_col),
-            "SOG/60": val(s_col),
-            "BLK/60": val(blk_col),
-            "CF/60": val(cf_col),
-            "xGF/60": val(xgf_col),
-            "HDCF/60": val(hdcf_col)
-        }
-        if team_code:
-            row["Team"] = team_code
-        out.append(row)
-    return pd.DataFrame(out)
+    # column-wise: names stripped in one pass, rates coerced per column
+    names = pd.Series([_RE_TAGS.sub("", str(v).strip()) for v in df[name_col]])
+    def val(c):
+        if c is None:
+            return float("nan")
+        return pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float)
+    out = pd.DataFrame({
+        "PlayerRaw": names,
+        "NormName": names.map(norm_name),
+        "G/60": val(g_col),
+        "A/60": val(a_col),
+        "SOG/60": val(s_col),
+        "BLK/60": val(blk_col),
+        "CF/60": val(cf_col),
+        "xGF/60": val(xgf_col),
+        "HDCF/60": val(hdcf_col)
+    })
+    if team_code:
+        out["Team"] = team_code
+    return out
 
 def get_team_players(team_code: str, season_code: str, tgp: Optional[int]=None) -> pd.DataFrame:
     """
@@ -234,46 +349,42 @@ def get_team_players(team_code: str, season_code: str, tgp: Optional[int]=None)
         qs += f"&tgp={tgp}"
     url = f"https://www.naturalstattrick.com/playerteams.php?{qs}"
     tag = f"nst_players_{team_code}_{season_code}_{tgp or 'all'}"
-    html = http_get_cached(url, tag=tag, sleep=DEFAULT_SLEEP)
-    if not html:
-        return pd.DataFrame()
+    df = parsed_cache(url, tag, lambda html: _parse_team_players_html(html, team_code, tag))
+    return pd.DataFrame() if df is None else df
+
+def _parse_team_players_html(html: str, team_code: str, tag: str) -> pd.DataFrame:
     tables = _safe_read_html(html)
     if not tables:
         # fallback to row regex parsing similar to earlier approaches
-        rows = re.findall(r"<tr[^>]*>(.*?)</tr>", html, flags=re.IGNORECASE|re.DOTALL)
         out = []
-        for row in rows:
-            m_name = re.search(r'player(?:\.php\?id=|id=)\d+[^>]*>([^<]+)</a>', row, flags=re.IGNORECASE)
+        for m_row in _RE_ROW.finditer(html):
+            row = m_row.group(1)
+            m_name = _RE_PLAYER_LINK.search(row)
             if not m_name:
                 continue
             pname = m_name.group(1).strip()
             def pick_num(label):
-                pats = [
-                    rf'{label}\s*/\s*60[^0-9\-]*([0-9]*\.?[0-9]+)',
-                    rf'{label}60[^0-9\-]*([0-9]*\.?[0-9]+)',
-                    rf'{label}[^0-9\-]*([0-9]*\.?[0-9]+)'
-                ]
-                for pat in pats:
-                    m = re.search(pat, row, flags=re.IGNORECASE)
+                for pat in _PLAYER_LABEL_RES[label]:
+                    m = pat.search(row)
                     if m:
                         try:
                             return float(m.group(1))
                         except:
                             pass
                 return pd.NA
-            out.append({
-                "PlayerRaw": pname,
-                "NormName": norm_name(pname),
-                "G/60": pick_num("G"),
-                "A/60": pick_num("A"),
-                "SOG/60": pick_num("S"),
-                "BLK/60": pick_num("Blk"),
-                "CF/60": pick_num("CF"),
-                "xGF/60": pick_num("xGF"),
-                "HDCF/60": pick_num("HDCF"),
-                "Team": team_code
-            })
-        return pd.DataFrame(out)
+            out.append((
+                pname,
+                norm_name(pname),
+                pick_num("G"),
+                pick_num("A"),
+                pick_num("S"),
+                pick_num("Blk"),
+                pick_num("CF"),
+                pick_num("xGF"),
+                pick_num("HDCF"),
+                team_code,
+            ))
+        return pd.DataFrame.from_records(out, columns=_PLAYER_FALLBACK_COLS)
     # Usually the first table or one of the tables contains players
     # Try to find the one containing "Player" or "Player" in header
     chosen = None
@@ -289,7 +400,7 @@ def get_team_players(team_code: str, season_code: str, tgp: Optional[int]=None)
     for c in ["G/60","A/60","SOG/60","BLK/60","CF/60","xGF/60","HDCF/60"]:
         if c not in parsed.columns:
             parsed[c] = pd.NA
-    parsed.to_csv(os.path.join(DATA_DIR, f"nst_players_{team_code}_{season_code}_{tgp or 'all'}.csv"), index=False)
+    save_snapshot(parsed, tag, DATA_DIR)
     return parsed
 
 # ---- Line combos (NST lines page) ----
@@ -300,28 +411,31 @@ def get_line_combos(team_code: str, season_code: str) -> pd.DataFrame:
     """
     url = f"https://www.naturalstattrick.com/line_combos.php?team={team_code}&season={season_code}&stype=2"
     tag = f"nst_line_combos_{team_code}_{season_code}"
-    html = http_get_cached(url, tag=tag, sleep=DEFAULT_SLEEP)
-    if not html:
-        return pd.DataFrame()
+    df = parsed_cache(url, tag, lambda html: _parse_line_combos_html(html, team_code, tag))
+    return pd.DataFrame() if df is None else df
+
+def _parse_line_combos_html(html: str, team_code: str, tag: str) -> pd.DataFrame:
     tables = _safe_read_html(html)
     if not tables:
-        # fallback parse rows
-        rows = re.findall(r"<tr[^>]*>(.*?)</tr>", html, flags=re.IGNORECASE|re.DOTALL)
+        # fallback: walk <tr>/<td> nodes with lxml (C parser) rather than
+        # regex-splitting the markup row by row
+        try:
+            tree = lxml_html.fromstring(html.encode("utf-8"), parser=_lxml_parser())
+        except Exception:
+            return pd.DataFrame()
         out = []
-        for row in rows:
+        for tr in tree.iter("tr"):
             # attempt to capture three skaters in cells
-            cells = re.findall(r"<td[^>]*>(.*?)</td>", row, flags=re.IGNORECASE|re.DOTALL)
+            cells = tr.findall("td")
             if len(cells) < 5:
                 continue
-            # best-effort: first cell(s) are players separated by breaks
-            players_html = cells[0]
-            players = re.findall(r'>([^<]+)</a>', players_html)
-            players = [p.strip() for p in players if p.strip()]
-            players = players[:3]
+            # best-effort: first cell holds the player links
+            players = [a.text_content().strip() for a in cells[0].iter("a")]
+            players = [p for p in players if p][:3]
             def num_from_cells(idx):
                 try:
-                    txt = re.sub(r"<[^>]+>", "", cells[idx])
-                    return float(re.sub(r"[^\d\.\-]","", txt)) if txt.strip() else pd.NA
+                    txt = cells[idx].text_content()
+                    return float(_RE_NON_NUM.sub("", txt)) if txt.strip() else pd.NA
                 except Exception:
                     return pd.NA
             toi = num_from_cells(1)
@@ -329,20 +443,16 @@ def get_line_combos(team_code: str, season_code: str) -> pd.DataFrame:
             ca = num_from_cells(3)
             xgf = num_from_cells(4)
             xga = num_from_cells(5) if len(cells) > 5 else pd.NA
-            out.append({
-                "Team": team_code,
-                "Players": players,
-                "P1": players[0] if len(players)>0 else pd.NA,
-                "P2": players[1] if len(players)>1 else pd.NA,
-                "P3": players[2] if len(players)>2 else pd.NA,
-                "TOI": toi,
-                "CF": cf,
-                "CA": ca,
-                "xGF": xgf,
-                "xGA": xga
-            })
-        df = pd.DataFrame(out)
-        df.to_csv(os.path.join(DATA_DIR, f"nst_line_combos_{team_code}_{season_code}.csv"), index=False)
+            out.append((
+                team_code,
+                players,
+                players[0] if len(players)>0 else pd.NA,
+                players[1] if len(players)>1 else pd.NA,
+                players[2] if len(players)>2 else pd.NA,
+                toi, cf, ca, xgf, xga,
+            ))
+        df = pd.DataFrame.from_records(out, columns=_LINE_COMBO_COLS)
+        save_snapshot(df, tag, DATA_DIR)
         return df
 
     # Usually the first table is combos; try to find
@@ -367,16 +477,16 @@ def get_line_combos(team_code: str, season_code: str) -> pd.DataFrame:
     # extract player names
     players_list = []
     for cell in df[player_col].astype(str):
-        names = re.findall(r'>([^<]+)</a>', cell)
+        names = _RE_ANCHOR_TEXT.findall(cell)
         if not names:
             # fallback split on newline or /
-            parts = re.split(r"\s*[/\n,]\s*", re.sub(r"<[^>]+>","", cell))
+            parts = _RE_NAME_SPLIT.split(_RE_TAGS.sub("", cell))
             names = [p.strip() for p in parts if p.strip()][:3]
         players_list.append(names)
     df["Players"] = players_list
-    df["P1"] = df["Players"].apply(lambda x: x[0] if isinstance(x, list) and len(x)>0 else pd.NA)
-    df["P2"] = df["Players"].apply(lambda x: x[1] if isinstance(x, list) and len(x)>1 else pd.NA)
-    df["P3"] = df["Players"].apply(lambda x: x[2] if isinstance(x, list) and len(x)>2 else pd.NA)
+    # P1..P3 straight from the python lists, not a per-cell apply
+    for i, c in enumerate(["P1","P2","P3"]):
+        df[c] = [names[i] if len(names) > i else pd.NA for names in players_list]
 
     # coerce numeric columns heuristically
     for cand in df.columns:
@@ -406,10 +516,57 @@ def get_line_combos(team_code: str, season_code: str) -> pd.DataFrame:
             df[k] = pd.NA
 
     df["Team"] = team_code
-    df.to_csv(os.path.join(DATA_DIR, f"nst_line_combos_{team_code}_{season_code}.csv"), index=False)
+    save_snapshot(df, tag, DATA_DIR)
     return df
 
 # ---- Goalies ----
+def _parse_goalie_html(html: str) -> pd.DataFrame:
+    """Parse an NST goalie playerteams page into PlayerRaw, NormName, SV%."""
+    tables = _safe_read_html(html)
+    out = []
+    if tables:
+        # find table with SV%
+        chosen = None
+        for t in tables:
+            cols = [str(c).lower() for c in t.columns]
+            if any("sv%" in c.lower() or "sv%" == c for c in cols):
+                chosen = t
+                break
+        if chosen is None:
+            chosen = tables[0]
+        # locate columns
+        colmap = {c.lower(): c for c in chosen.columns}
+        sv_col = None
+        for k in colmap:
+            if "sv" in k and "%" in k:
+                sv_col = colmap[k]; break
+        # name column
+        name_col = None
+        for k in colmap:
+            if "player" in k:
+                name_col = colmap[k]; break
+        if name_col is None:
+            name_col = chosen.columns[0]
+        # column-wise: no Series built per goalie row
+        raw = pd.Series([_RE_TAGS.sub("", str(v).strip()) for v in chosen[name_col]])
+        if sv_col:
+            txt = chosen[sv_col].map(str).str.replace(_RE_NON_PCT, "", regex=True)
+            sv = pd.to_numeric(txt, errors="coerce").to_numpy() / 100.0
+        else:
+            sv = None
+        return pd.DataFrame({"PlayerRaw": raw, "NormName": raw.map(norm_name), "SV%": sv})
+    # fallback regex parse
+    for m_row in _RE_ROW.finditer(html):
+        row = m_row.group(1)
+        m_name = _RE_PLAYER_LINK.search(row)
+        if not m_name:
+            continue
+        pname = m_name.group(1).strip()
+        sv_match = _RE_SV.search(row)
+        sv_pct = float(sv_match.group(1))/100.0 if sv_match else pd.NA
+        out.append((pname, norm_name(pname), sv_pct))
+    return pd.DataFrame.from_records(out, columns=["PlayerRaw", "NormName", "SV%"])
+
 def get_goalies(season: str, last_season: Optional[str]=None) -> pd.DataFrame:
     """
     Pull goalie lists (season, recent tgp=10, last season) and return merged DataFrame:
@@ -418,67 +575,25 @@ def get_goalies(season: str, last_season: Optional[str]=None) -> pd.DataFrame:
     if not last_season:
         last_season = str(int(season[:4]) - 1) + str(int(season[:4]))
 
-    def fetch_goalie_stats(season_q: str, tgp: Optional[int]=None):
+    def fetch_goalie_stats(season_q: str, tgp: Optional[int]=None, max_age_days: int=0):
         qs = f"fromseason={season_q}&thruseason={season_q}&sit=all&playerstype=goalies"
         if tgp:
             qs += f"&tgp={tgp}"
         url = f"https://www.naturalstattrick.com/playerteams.php?{qs}"
         tag = f"nst_goalies_{season_q}_{tgp or 'all'}"
-        html = http_get_cached(url, tag=tag, sleep=DEFAULT_SLEEP)
-        if not html:
-            return pd.DataFrame()
-        tables = _safe_read_html(html)
-        out = []
-        if tables:
-            # find table with SV%
-            chosen = None
-            for t in tables:
-                cols = [str(c).lower() for c in t.columns]
-                if any("sv%" in c.lower() or "sv%" == c for c in cols):
-                    chosen = t
-                    break
-            if chosen is None:
-                chosen = tables[0]
-            # locate columns
-            colmap = {c.lower(): c for c in chosen.columns}
-            sv_col = None
-            for k in colmap:
-                if "sv" in k and "%" in k:
-                    sv_col = colmap[k]; break
-            # name column
-            name_col = None
-            for k in colmap:
-                if "player" in k:
-                    name_col = colmap[k]; break
-            if name_col is None:
-                name_col = chosen.columns[0]
-            for _, r in chosen.iterrows():
-                raw = str(r.get(name_col, "")).strip()
-                raw = re.sub(r"<[^>]+>", "", raw)
-                sv_val = None
-                if sv_col:
-                    try:
-                        txt = str(r.get(sv_col, ""))
-                        sv_val = float(re.sub(r"[^\d\.]","", txt)) / 100.0 if txt and txt.strip() else pd.NA
-                    except Exception:
-                        sv_val = pd.NA
-                out.append({"PlayerRaw": raw, "NormName": norm_name(raw), "SV%": sv_val})
-            return pd.DataFrame(out)
-        # fallback regex parse
-        rows = re.findall(r"<tr[^>]*>(.*?)</tr>", html, flags=re.IGNORECASE|re.DOTALL)
-        for row in rows:
-            m_name = re.search(r'player(?:\.php\?id=|id=)\d+[^>]*>([^<]+)</a>', row, flags=re.IGNORECASE)
-            if not m_name:
-                continue
-            pname = m_name.group(1).strip()
-            sv_match = re.search(r'SV%[^0-9]*([0-9]*\.?[0-9]+)', row, flags=re.IGNORECASE)
-            sv_pct = float(sv_match.group(1))/100.0 if sv_match else pd.NA
-            out.append({"PlayerRaw": pname, "NormName": norm_name(pname), "SV%": sv_pct})
-        return pd.DataFrame(out)
-
-    season_df = fetch_goalie_stats(season).rename(columns={"SV%":"SV_season"})
-    recent_df = fetch_goalie_stats(season, tgp=10).rename(columns={"SV%":"SV_recent"})
-    last_df   = fetch_goalie_stats(last_season).rename(columns={"SV%":"SV_last"})
+        df = parsed_cache(url, tag, _parse_goalie_html, max_age_days=max_age_days)
+        return pd.DataFrame() if df is None else df
+
+    # The three split pages are independent; fetch them side by side
+    # (throttle() still paces requests to NST)
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        season_f = ex.submit(fetch_goalie_stats, season)
+        recent_f = ex.submit(fetch_goalie_stats, season, tgp=10)
+        last_f   = ex.submit(fetch_goalie_stats, last_season,
+                             max_age_days=COMPLETED_SEASON_CACHE_DAYS)
+    season_df = season_f.result().rename(columns={"SV%":"SV_season"})
+    recent_df = recent_f.result().rename(columns={"SV%":"SV_recent"})
+    last_df   = last_f.result().rename(columns={"SV%":"SV_last"})
 
     # guard against empty dfs
     if season_df.empty and recent_df.empty and last_df.empty:
@@ -499,7 +614,7 @@ def get_goalies(season: str, last_season: Optional[str]=None) -> pd.DataFrame:
     if "SV_season" not in merged.columns:
         merged["SV_season"] = pd.NA
 
-    merged.to_csv(os.path.join(DATA_DIR, "nst_goalies_merged.csv"), index=False)
+    save_snapshot(merged, "nst_goalies_merged", DATA_DIR)
     return merged
 
 # ---- Utilities ----
@@ -546,90 +661,88 @@ def merge_dfo_lines_with_nst(dfo_lines_df: pd.DataFrame, nst_line_df: pd.DataFra
     nst = nst_line_df.copy()
     # ensure P1/P2/P3 exist in NST (they may be columns or inside Players list)
     if "P1" not in nst.columns and "Players" in nst.columns:
-        nst["P1"] = nst["Players"].apply(lambda pl: pl[0] if isinstance(pl, (list,tuple)) and len(pl)>0 else pd.NA)
-        nst["P2"] = nst["Players"].apply(lambda pl: pl[1] if isinstance(pl, (list,tuple)) and len(pl)>1 else pd.NA)
-        nst["P3"] = nst["Players"].apply(lambda pl: pl[2] if isinstance(pl, (list,tuple)) and len(pl)>2 else pd.NA)
-
-    # normalized sets
-    def trio_set(row, cols):
-        names = []
-        for c in cols:
-            v = row.get(c, pd.NA)
-            if pd.isna(v):
-                continue
-            names.append(norm_name(str(v)))
-        return frozenset(names)
-
-    nst["__trio"] = nst.apply(lambda r: trio_set(r, ["P1","P2","P3"]), axis=1)
-    dfo["__trio"] = dfo.apply(lambda r: trio_set(r, ["Player1","Player2","Player3"]), axis=1)
-
-    # Build lookup: team -> trio -> nst row index
-    lookup = {}
-    for idx, r in nst.iterrows():
-        t = r.get("Team", None)
-        trio = r.get("__trio", frozenset())
-        if t not in lookup:
-            lookup[t] = {}
-        if trio not in lookup[t]:
-            lookup[t][trio] = idx
-
-    merged_rows = []
-    for _, r in dfo.iterrows():
-        team = r.get("Team")
-        trio = r.get("__trio", frozenset())
-        match_idx = None
-        if team in lookup and trio in lookup[team]:
-            match_idx = lookup[team][trio]
-        # fallback: try matching ignoring team (rare)
-        if match_idx is None:
-            for tmap in lookup.values():
-                if trio in tmap:
-                    match_idx = tmap[trio]; break
-        nst_row = nst.loc[match_idx] if match_idx is not None else pd.Series()
-        merged = r.to_dict()
-        # attach NST metrics
-        for c in ["TOI","CF","CA","xGF","xGA","SF","SCF","HDCF"]:
-            merged[c] = nst_row.get(c, pd.NA) if not nst_row.empty else pd.NA
-        merged_rows.append(merged)
+        lists = [pl if isinstance(pl, (list,tuple)) else () for pl in nst["Players"]]
+        for i, c in enumerate(["P1","P2","P3"]):
+            nst[c] = [pl[i] if len(pl) > i else pd.NA for pl in lists]
+
+    # normalized sets, built column-wise (no Series per row)
+    def trio_sets(df, cols):
+        cols = [df[c] if c in df.columns else [pd.NA] * len(df) for c in cols]
+        return [
+            frozenset(norm_name(str(v)) for v in names if not pd.isna(v))
+            for names in zip(*cols)
+        ]
+
+    nst["__trio"] = trio_sets(nst, ["P1","P2","P3"])
+    dfo["__trio"] = trio_sets(dfo, ["Player1","Player2","Player3"])
+
+    metric_cols = ["TOI","CF","CA","xGF","xGA","SF","SCF","HDCF"]
+
+    # Lookups built once: (team, trio) -> first NST row, and trio -> first
+    # NST row on any team (rare fallback), both as row positions
+    nst_teams = nst["Team"] if "Team" in nst.columns else [None] * len(nst)
+    by_team, any_team = {}, {}
+    for pos, (t, trio) in enumerate(zip(nst_teams, nst["__trio"])):
+        by_team.setdefault((t, trio), pos)
+        any_team.setdefault(trio, pos)
+
+    dfo_teams = dfo["Team"] if "Team" in dfo.columns else [None] * len(dfo)
+    match_pos = [
+        by_team.get((t, trio), any_team.get(trio))
+        for t, trio in zip(dfo_teams, dfo["__trio"])
+    ]
+
+    # attach NST metrics (unmatched lines get NA)
+    metrics = nst.reindex(columns=metric_cols).reset_index(drop=True).reindex(match_pos)
+    outdf = dfo.reset_index(drop=True)
+    for c in metric_cols:
+        outdf[c] = metrics[c].to_numpy()
 
-    outdf = pd.DataFrame(merged_rows)
     # compute per60 rates for convenience
     outdf = compute_per60(outdf, toi_col="TOI")
-    outdf.to_csv(os.path.join(DATA_DIR, "dfo_nst_lines_merged.csv"), index=False)
+    save_snapshot(outdf, "dfo_nst_lines_merged", DATA_DIR)
     return outdf
 
 # ---- Convenience bulk functions ----
 def fetch_all_teams_players(team_list, season_code):
     """
     Helper to fetch full-season and recent (tgp=10) players for all teams in team_list.
+    Every (team, split) page is its own job on the pool (MAX_WORKERS), so a
+    team's two pages don't wait on each other and one failing split doesn't
+    drop the other; the per-host throttle in http_get_cached keeps NST
+    request spacing unchanged.
     Returns two DataFrames: players_season, players_recent (concatenated).
     """
-    season_list = []
-    recent_list = []
-    for t in team_list:
+    def fetch_split(t, tgp):
         try:
-            s = get_team_players(t, season_code)
-            if not s.empty:
-                season_list.append(s)
-            r = get_team_players(t, season_code, tgp=10)
-            if not r.empty:
-                recent_list.append(r)
+            return get_team_players(t, season_code, tgp=tgp)
         except Exception as e:
-            print(f"⚠️ Error fetching players for {t}: {e}")
+            print(f"⚠️ Error fetching players for {t} (tgp={tgp}): {e}")
+            return pd.DataFrame()
+
+    # One fetch per team even if a schedule lists a team twice (order kept)
+    teams = list(dict.fromkeys(team_list))
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        season_jobs = [ex.submit(fetch_split, t, None) for t in teams]
+        recent_jobs = [ex.submit(fetch_split, t, 10) for t in teams]
+        season_list = [df for df in (f.result() for f in season_jobs) if not df.empty]
+        recent_list = [df for df in (f.result() for f in recent_jobs) if not df.empty]
     season_df = pd.concat(season_list, ignore_index=True) if season_list else pd.DataFrame()
     recent_df = pd.concat(recent_list, ignore_index=True) if recent_list else pd.DataFrame()
     return season_df, recent_df
 
 def fetch_all_line_combos(team_list, season_code):
     """
-    Helper to fetch line combos for every team and return concatenated DataFrame.
+    Helper to fetch line combos for every team (concurrently) and return concatenated DataFrame.
     """
-    combos = []
-    for t in team_list:
+    def fetch_team(t):
         try:
-            df = get_line_combos(t, season_code)
-            if not df.empty:
-                combos.append(df)
+            return get_line_combos(t, season_code)
         except Exception as e:
             print(f"⚠️ Error fetching line combos for {t}: {e}")
+            return pd.DataFrame()
+
+    teams = list(dict.fromkeys(team_list))
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        combos = [df for df in ex.map(fetch_team, teams) if not df.empty]
     return pd.concat(combos, ignore_index=True) if combos else pd.DataFrame()
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 def _ensure_int_series(s: pd.Series) -> pd.Series:
@@ -16,12 +17,13 @@ def tag_missing_baseline(merged_lineups_df: pd.DataFrame, baseline_players_df: p
     merged = merged_lineups_df.copy()
 
     if "playerId" in merged.columns and "playerId" in baseline_players_df.columns:
-        lineup_ids = set(_ensure_int_series(merged["playerId"]).unique())
-        base_ids = set(_ensure_int_series(baseline_players_df["playerId"]).unique())
-        missing_ids = lineup_ids - base_ids
+        # Sorted-array set difference in NumPy; no Python sets of boxed ints
+        lineup_ids = _ensure_int_series(merged["playerId"]).to_numpy()
+        base_ids = _ensure_int_series(baseline_players_df["playerId"]).to_numpy()
+        missing_ids = np.setdiff1d(lineup_ids, base_ids)
         merged["_missingBaseline"] = merged["playerId"].isin(missing_ids)
     elif "NormName" in merged.columns and "NormName" in baseline_players_df.columns:
-        base_names = set(baseline_players_df["NormName"].unique())
+        base_names = baseline_players_df["NormName"].unique()
         merged["_missingBaseline"] = ~merged["NormName"].isin(base_names)
     else:
         # Fallback: nothing to tag
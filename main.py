@@ -1,11 +1,17 @@
 # main.py
 # NHL DFS projections with optional DK salaries and line-aware stacks.
 
+import glob
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 
+import numpy as np
 import pandas as pd
 
+from adp_nhl.utils.common import float32_as_float64
+
 # -------------------------------------------------------------------
 # BASIC SETTINGS
 # -------------------------------------------------------------------
@@ -13,24 +19,45 @@ import pandas as pd
 DATA_DIR = "data"
 if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR, exist_ok=True)
+RAW_DIR = os.path.join(DATA_DIR, "raw")
 
 CURR_SEASON = "2024-2025"
+NST_MAX_WORKERS = 4  # concurrent NST team scrapes
+EXCEL_SKIP_TABS = {"NST_Raw"}  # large debug tabs kept out of the workbook
+
+DK_SALARIES_CSV = os.path.join(DATA_DIR, "DKSalaries.csv")
+DK_SALARIES_GLOB = os.path.join(DATA_DIR, "DKSalaries*.csv")
 
 FALLBACK_SF60 = 30.0
 FALLBACK_xGA60 = 2.8
 LEAGUE_AVG_SV = 0.905
+# Goalie SV% split weights (scraper columns), renormalized when one is missing
+SV_BLEND_WEIGHTS = {"SV_recent": 0.50, "SV_season": 0.35, "SV_last": 0.15}
 
 DK_WEIGHTS = {
     "goal": 8.0,
     "assist": 5.0,
     "shot": 1.6,
     "block": 1.3,
+    "save": 0.7,
+    "goal_against": 3.5,
 }
 
+# Per-60 rate columns and their DK weights, in matching order
+SKATER_RATE_COLS = ["G60", "A60", "SOG60", "BLK60"]
+SKATER_RATE_WEIGHTS = np.array(
+    [DK_WEIGHTS["goal"], DK_WEIGHTS["assist"], DK_WEIGHTS["shot"], DK_WEIGHTS["block"]],
+    dtype=np.float32,
+)
+
 FALLBACK_PER60 = {
     "D": {"G60": 0.2, "A60": 0.8, "SOG60": 3.0, "BLK60": 2.0},
     "F": {"G60": 0.7, "A60": 0.7, "SOG60": 3.5, "BLK60": 0.5},
 }
+# The same fallbacks as arrays in SKATER_RATE_COLS order (float32, like
+# the skater projection arithmetic they feed)
+FALLBACK_RATES_D = np.array([FALLBACK_PER60["D"][c] for c in SKATER_RATE_COLS], dtype=np.float32)
+FALLBACK_RATES_F = np.array([FALLBACK_PER60["F"][c] for c in SKATER_RATE_COLS], dtype=np.float32)
 
 # -------------------------------------------------------------------
 # STUBS FOR YOUR REAL DATA SOURCES
@@ -48,16 +75,60 @@ class NSTScraperStub(object):
 
 nst_scraper = NSTScraperStub()
 
-def load_dk_salaries():
+def load_dk_salaries(path=None):
     """
     OPTIONAL.
     Return DraftKings salaries as a DataFrame with columns:
-    Player, Team, Position, Salary, Opponent (optional).
+    Player, Team, Position, Salary, NormName.
 
-    For now we return an empty DF so projections can run without salaries.
-    When you are ready, replace this with a real CSV loader.
+    Reads the DK salary export: by default the newest data/DKSalaries*.csv
+    (one glob, picked by mtime), so older slates' exports are never parsed.
+    Returns an empty DF when no file is present so projections can run
+    without salaries. The parsed frame is cached as <export>.parquet.
     """
-    return pd.DataFrame()
+    if path is None:
+        exports = glob.glob(DK_SALARIES_GLOB)
+        path = max(exports, key=os.path.getmtime) if exports else DK_SALARIES_CSV
+    if not os.path.exists(path):
+        return pd.DataFrame()
+
+    # Parsed + normalized salaries are cached next to the export; reuse
+    # them until the CSV is replaced or touched (mtime newer than cache)
+    cache_path = os.path.splitext(path)[0] + ".parquet"
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+        try:
+            return pd.read_parquet(cache_path)
+        except Exception as e:
+            print("DK salary cache unreadable; re-parsing: " + str(e))
+
+    # Sniff the header so only the four needed columns are parsed
+    header = pd.read_csv(path, nrows=0).columns
+    by_lower = {str(c).strip().lower(): c for c in header}
+    wanted = {"name": "Player", "teamabbrev": "Team", "position": "Position", "salary": "Salary"}
+    if not set(wanted).issubset(by_lower):
+        print("DK salaries file missing columns; skipping: " + path)
+        return pd.DataFrame()
+    usecols = [by_lower[k] for k in wanted]
+
+    try:
+        df = pd.read_csv(path, engine="pyarrow", usecols=usecols)
+    except (ImportError, ValueError):
+        df = pd.read_csv(path, usecols=usecols)
+
+    df = df.rename(columns={by_lower[k]: v for k, v in wanted.items()})
+    df = df[["Player", "Team", "Position", "Salary"]]
+    df["Team"] = df["Team"].astype(str).str.upper()
+    salary = df["Salary"]
+    if not pd.api.types.is_numeric_dtype(salary):
+        # "$5,400"-style text: two literal strips, no regex pass per cell
+        salary = salary.astype(str).str.replace(",", "", regex=False).str.lstrip("$")
+    df["Salary"] = pd.to_numeric(salary, errors="coerce").fillna(0).astype("int32")
+    df["NormName"] = norm_names(df["Player"])
+    try:
+        df.to_parquet(cache_path, engine="pyarrow", compression="zstd", index=False)
+    except Exception as e:
+        print("DK salary cache write failed: " + str(e))
+    return df
 
 def get_today_schedule():
     """
@@ -71,9 +142,11 @@ def upload_to_sheets(sheet_name, tabs_dict):
     # Stub; safe no-op
     print("Sheets upload skipped (stub).")
 
-def get_all_lines(schedule_df):
+def get_all_lines(teams):
     """
     OPTIONAL real implementation.
+    teams: team codes playing today (schedule_teams output), so the
+    unique-team pass over the schedule is not repeated here.
     For now, returns empty DF so Line stays 'NA' but stacks still group by NA.
     Real version should have columns:
       NormName, Team, Line
@@ -84,16 +157,148 @@ def get_all_lines(schedule_df):
 # HELPER FUNCTIONS
 # -------------------------------------------------------------------
 
-def safe_get_from_series(s, keys, default=None):
-    for k in keys:
-        if k in s and pd.notnull(s[k]):
-            return s[k]
-    return default
+def first_column(df, keys):
+    """Name of the first of keys present in df, or None."""
+    return next((k for k in keys if k in df.columns), None)
+
+def numeric_column(df, keys, default=0.0):
+    """
+    First of keys present in df as a float column (unparseable -> default).
+    Falls back to a constant column, so callers never get a bare scalar.
+    """
+    k = first_column(df, keys)
+    if k is not None:
+        return pd.to_numeric(df[k], errors="coerce").fillna(default)
+    return pd.Series(default, index=df.index, dtype=float)
+
+def save_output(df, name):
+    """
+    Write data/<name>.csv plus a data/<name>.parquet sibling for warm starts.
+    CSV goes through pyarrow's C++ writer; falls back to pandas if pyarrow
+    is missing or can't convert a column.
+    """
+    csv_path = os.path.join(DATA_DIR, name + ".csv")
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+
+        pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), csv_path)
+    except Exception:
+        df.to_csv(csv_path, index=False)
+
+    save_parquet(df, name)
+
+def shrink_frame(df, max_ratio=0.5, floats=True):
+    """
+    Smaller dtypes: low-cardinality string columns become category and
+    int64 columns take the narrowest integer type (both lossless);
+    float64 columns are downcast to float32 unless floats=False.
+    """
+    out = df.copy(deep=False)
+    n = len(out)
+    for col in out.select_dtypes(include=["object", "string"]).columns:
+        try:
+            low_card = n and out[col].nunique(dropna=True) / n < max_ratio
+        except TypeError:
+            continue  # unhashable cells (e.g. lists) stay as they are
+        if low_card:
+            out[col] = out[col].astype("category")
+    for col in out.select_dtypes(include=["int64"]).columns:
+        out[col] = pd.to_numeric(out[col], downcast="integer")
+    if floats:
+        for col in out.select_dtypes(include=["float64"]).columns:
+            out[col] = pd.to_numeric(out[col], downcast="float")
+    return out
+
+def save_parquet(df, name):
+    """Write data/<name>.parquet (zstd), shrinking dtypes first."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(shrink_frame(df), preserve_index=False)
+        pq.write_table(table, os.path.join(DATA_DIR, name + ".parquet"), compression="zstd")
+    except Exception as e:
+        print("Parquet write failed for " + name + ": " + str(e))
+
+def export_xlsx_enabled():
+    """Excel export is opt-in: set EXPORT_XLSX=1 (CI does, for the artifact)."""
+    return os.environ.get("EXPORT_XLSX", "").strip().lower() in ("1", "true", "yes")
+
+def daily_cached(tag, build):
+    """
+    Return today's data/raw/<tag>_YYYYMMDD.parquet if present; otherwise
+    call build(), store a non-empty result there, and return it. Reruns on
+    the same day skip the scrape entirely. Fresh results are shrunk
+    losslessly (categories, narrow ints; floats untouched) before they are
+    stored and returned, so cold and warm runs see the same dtypes.
+    """
+    today = datetime.today().strftime("%Y%m%d")
+    path = os.path.join(RAW_DIR, tag + "_" + today + ".parquet")
+    if os.path.exists(path):
+        try:
+            return pd.read_parquet(path)
+        except Exception as e:
+            print("Cache read failed for " + tag + ": " + str(e))
+
+    df = build()
+    if df is not None and not df.empty:
+        df = shrink_frame(df, floats=False)
+        try:
+            os.makedirs(RAW_DIR, exist_ok=True)
+            df.to_parquet(path, index=False)
+        except Exception as e:
+            print("Cache write failed for " + tag + ": " + str(e))
+    return df
+
+def toi_to_minutes(toi):
+    """
+    Column-wise TOI parse: "mm:ss" strings become minutes, other values are
+    read as numbers, and anything unparseable becomes 0.0.
+    """
+    txt = toi.astype("string")
+    parts = txt.str.split(":", expand=True)
+    is_clock = txt.str.contains(":", regex=False).fillna(False).to_numpy(dtype=bool)
+    if parts.shape[1] >= 2:
+        clock = (
+            pd.to_numeric(parts[0], errors="coerce")
+            + pd.to_numeric(parts[1], errors="coerce") / 60.0
+        )
+    else:
+        clock = pd.Series(np.nan, index=toi.index)
+    plain = pd.to_numeric(txt.where(~is_clock), errors="coerce")
+    mins = np.where(is_clock, clock.to_numpy(dtype=float), plain.to_numpy(dtype=float))
+    bad = np.isnan(mins) & toi.notna().to_numpy()
+    return pd.Series(np.where(bad, 0.0, mins), index=toi.index)
+
+# Everything str.split() treats as whitespace; RE2's \s alone is ASCII-only
+_NAME_WS_PATTERN = "[\\s\x0b\x1c-\x1f\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]+"
+
+def norm_names(names):
+    """
+    Name join key: lower-case and drop all whitespace (same rule as
+    str.split()) with pandas string ops, one regex pass per column.
+    Missing values become "".
+    """
+    return (
+        names.where(names.notna(), "")
+        .astype(str)
+        .str.lower()
+        .str.replace(_NAME_WS_PATTERN, "", regex=True)
+    )
 
-def norm_name(name):
-    if not isinstance(name, str):
-        return ""
-    return "".join(name.lower().split())
+def schedule_teams(schedule_df):
+    """
+    Unique team codes on today's schedule, computed once and reused by
+    the per-team fetch loops. Empty array when there is no schedule.
+    """
+    if schedule_df is None or schedule_df.empty:
+        return np.array([], dtype=object)
+    if not {"Home", "Away"}.issubset(schedule_df.columns):
+        return np.array([], dtype=object)
+    home = schedule_df["Home"].astype(str).str.upper().to_numpy()
+    away = schedule_df["Away"].astype(str).str.upper().to_numpy()
+    return np.union1d(home, away)
 
 def build_opp_map(schedule_df):
     opp_map = {}
@@ -101,12 +306,13 @@ def build_opp_map(schedule_df):
         return opp_map
     if not {"Home", "Away"}.issubset(schedule_df.columns):
         return opp_map
-    for _, row in schedule_df.iterrows():
-        h = str(row["Home"]).upper()
-        a = str(row["Away"]).upper()
-        if h and a:
-            opp_map[h] = a
-            opp_map[a] = h
+    home = schedule_df["Home"].astype(str).str.upper().to_numpy()
+    away = schedule_df["Away"].astype(str).str.upper().to_numpy()
+    # Rows with both sides filled; each team appears once on a slate, so
+    # the two directions can be built as bulk dict inserts
+    keep = (home != "") & (away != "")
+    opp_map.update(zip(home[keep], away[keep]))
+    opp_map.update(zip(away[keep], home[keep]))
     return opp_map
 
 # -------------------------------------------------------------------
@@ -156,91 +362,45 @@ def normalize_nst_skaters(nst_df_raw):
         ]
         return pd.DataFrame(columns=cols)
 
-    df = nst_df_raw.copy()
+    # Read from the raw frame, build only the output columns (no full copy)
+    raw = nst_df_raw
+    df = pd.DataFrame(index=raw.index)
 
-    name_cols = ["Name", "Player", "Player Name"]
-    name_col = None
-    for c in name_cols:
-        if c in df.columns:
-            name_col = c
-            break
+    name_col = first_column(raw, ["Name", "Player", "Player Name"])
     if name_col is None:
         df["Player"] = ""
     else:
-        df["Player"] = df[name_col].astype(str)
-    df["NormName"] = df["Player"].apply(norm_name)
-
-    team_cols = ["Team", "Tm", "Team Name"]
-    tcol = None
-    for c in team_cols:
-        if c in df.columns:
-            tcol = c
-            break
+        df["Player"] = raw[name_col].astype(str)
+    df["NormName"] = norm_names(df["Player"])
+
+    tcol = first_column(raw, ["Team", "Tm", "Team Name"])
     if tcol is None:
         df["Team"] = ""
     else:
-        df["Team"] = df[tcol].astype(str).str.upper()
-
-    pos_cols = ["Pos", "Position"]
-    pcol = None
-    for c in pos_cols:
-        if c in df.columns:
-            pcol = c
-            break
+        df["Team"] = raw[tcol].astype(str).str.upper()
+
+    pcol = first_column(raw, ["Pos", "Position"])
     if pcol is None:
         df["Position"] = "F"
     else:
-        df["Position"] = df[pcol].astype(str).str.upper().str[0]
-
-    df["Games"] = pd.to_numeric(
-        safe_get_from_series(df, ["GP", "Games"], default=0),
-        errors="coerce"
-    ).fillna(0)
-
-    toi_raw = None
-    for c in ["TOI", "TOI_Total", "TOI (min)", "Minutes"]:
-        if c in df.columns:
-            toi_raw = df[c]
-            break
-    if toi_raw is None:
+        df["Position"] = raw[pcol].astype(str).str.upper().str[0]
+
+    df["Games"] = numeric_column(raw, ["GP", "Games"])
+
+    toi_col = first_column(raw, ["TOI", "TOI_Total", "TOI (min)", "Minutes"])
+    if toi_col is None:
         df["TOI"] = df["Games"] * 15.0
     else:
-        if toi_raw.dtype == object:
-            mins = []
-            for v in toi_raw:
-                if isinstance(v, str) and ":" in v:
-                    parts = v.split(":")
-                    try:
-                        m = float(parts[0])
-                        s = float(parts[1])
-                        mins.append(m + s / 60.0)
-                    except Exception:
-                        mins.append(0.0)
-                else:
-                    try:
-                        mins.append(float(v))
-                    except Exception:
-                        mins.append(0.0)
-            df["TOI"] = mins
+        toi_raw = raw[toi_col]
+        if not pd.api.types.is_numeric_dtype(toi_raw):
+            df["TOI"] = toi_to_minutes(toi_raw)
         else:
             df["TOI"] = pd.to_numeric(toi_raw, errors="coerce").fillna(0)
 
-    df["Goals"] = pd.to_numeric(
-        safe_get_from_series(df, ["G", "Goals"], default=0),
-        errors="coerce"
-    ).fillna(0)
-    df["Assists"] = pd.to_numeric(
-        safe_get_from_series(df, ["A", "Assists"], default=0),
-        errors="coerce"
-    ).fillna(0)
-    df["Shots"] = pd.to_numeric(
-        safe_get_from_series(df, ["S", "Shots", "Shots on Goal"], default=0),
-        errors="coerce"
-    ).fillna(0)
-    df["Blocks"] = pd.to_numeric(
-        safe_get_from_series(df, ["B", "Blocks"], default=0),
-        errors="coerce"
-    ).fillna(0)
+    df["Goals"] = numeric_column(raw, ["G", "Goals"])
+    df["Assists"] = numeric_column(raw, ["A", "Assists"])
+    df["Shots"] = numeric_column(raw, ["S", "Shots", "Shots on Goal"])
+    df["Blocks"] = numeric_column(raw, ["B", "Blocks"])
 
     toi60 = df["TOI"].replace(0, 1e-6)
     df["G60"] = df["Goals"] / toi60 * 60.0
@@ -267,59 +427,61 @@ def normalize_nst_skaters(nst_df_raw):
         ]
     ]
 
+def blend_save_pcts(df):
+    """
+    Weighted SV% across the SV_BLEND_WEIGHTS split columns, as one array
+    pass: missing splits drop out and the remaining weights are
+    renormalized per goalie. No split at all -> LEAGUE_AVG_SV.
+    """
+    vals = np.column_stack(
+        [numeric_column(df, [c], np.nan).to_numpy(dtype=float) for c in SV_BLEND_WEIGHTS]
+    )
+    weights = np.array(list(SV_BLEND_WEIGHTS.values()))
+    present = ~np.isnan(vals)
+    num = np.where(present, vals, 0.0) @ weights
+    den = present @ weights
+    with np.errstate(invalid="ignore", divide="ignore"):
+        blend = np.where(den > 0, num / den, LEAGUE_AVG_SV)
+    return pd.Series(blend, index=df.index)
+
 def normalize_goalie_stats(goalie_df_raw):
     if goalie_df_raw is None or goalie_df_raw.empty:
         cols = ["Player", "NormName", "Team", "SV%", "Minutes"]
         return pd.DataFrame(columns=cols)
 
-    df = goalie_df_raw.copy()
-    name_cols = ["Name", "Player", "Player Name"]
-    name_col = None
-    for c in name_cols:
-        if c in df.columns:
-            name_col = c
-            break
+    # Read from the raw frame, build only the output columns (no full copy)
+    raw = goalie_df_raw
+    df = pd.DataFrame(index=raw.index)
+    name_col = first_column(raw, ["Name", "Player", "Player Name", "PlayerRaw"])
     if name_col is None:
         df["Player"] = ""
     else:
-        df["Player"] = df[name_col].astype(str)
-    df["NormName"] = df["Player"].apply(norm_name)
-
-    team_cols = ["Team", "Tm", "Team Name"]
-    tcol = None
-    for c in team_cols:
-        if c in df.columns:
-            tcol = c
-            break
+        df["Player"] = raw[name_col].astype(str)
+    df["NormName"] = norm_names(df["Player"])
+
+    tcol = first_column(raw, ["Team", "Tm", "Team Name"])
     if tcol is None:
         df["Team"] = ""
     else:
-        df["Team"] = df[tcol].astype(str).str.upper()
-
-    sv_cols = ["SV%", "Sv%", "Save%"]
-    scol = None
-    for c in sv_cols:
-        if c in df.columns:
-            scol = c
-            break
-    if scol is None:
-        df["SV%"] = LEAGUE_AVG_SV
+        df["Team"] = raw[tcol].astype(str).str.upper()
+
+    scol = first_column(raw, ["SV%", "Sv%", "Save%"])
+    if scol is not None:
+        df["SV%"] = pd.to_numeric(raw[scol], errors="coerce").fillna(LEAGUE_AVG_SV)
+    elif first_column(raw, list(SV_BLEND_WEIGHTS)) is not None:
+        # Scraper output: recent / season / last-season splits
+        df["SV%"] = blend_save_pcts(raw)
     else:
-        df["SV%"] = pd.to_numeric(df[scol], errors="coerce").fillna(LEAGUE_AVG_SV)
-        m = df["SV%"].mean()
-        if m > 1.5:
-            df["SV%"] = df["SV%"] / 100.0
-
-    min_cols = ["TOI", "Minutes", "Min"]
-    mcol = None
-    for c in min_cols:
-        if c in df.columns:
-            mcol = c
-            break
+        df["SV%"] = LEAGUE_AVG_SV
+    m = df["SV%"].mean()
+    if m > 1.5:
+        df["SV%"] = df["SV%"] / 100.0
+
+    mcol = first_column(raw, ["TOI", "Minutes", "Min"])
     if mcol is None:
         df["Minutes"] = 2000.0
     else:
-        df["Minutes"] = pd.to_numeric(df[mcol], errors="coerce").fillna(2000.0)
+        df["Minutes"] = pd.to_numeric(raw[mcol], errors="coerce").fillna(2000.0)
 
     return df[["Player", "NormName", "Team", "SV%", "Minutes"]]
 
@@ -335,14 +497,17 @@ def build_line_multipliers(skaters_df, team_stats):
     if skaters_df is None or skaters_df.empty:
         return {}
 
-    df = skaters_df.copy()
-    df["Line"] = df.get("Line", "NA").fillna("NA")
+    line = skaters_df["Line"].fillna("NA") if "Line" in skaters_df.columns else "NA"
+    # Categorical keys: both groupbys hash small integer codes, not strings
+    df = skaters_df[["Team", "G60", "SOG60"]].assign(Line=line)
+    df = df.astype({"Team": "category", "Line": "category"})
 
     # Compute team baseline "offense index"
     team_baseline = (
-        df.groupby("Team", dropna=False)[["G60", "SOG60"]]
+        df.groupby("Team", dropna=False, observed=True)[["G60", "SOG60"]]
         .mean()
         .reset_index()
+        .astype({"Team": object})
     )
     team_baseline["team_index"] = team_baseline["G60"] + 0.1 * team_baseline["SOG60"]
     team_index_map = dict(
@@ -351,28 +516,21 @@ def build_line_multipliers(skaters_df, team_stats):
 
     # Compute line "offense index"
     line_agg = (
-        df.groupby(["Team", "Line"], dropna=False)[["G60", "SOG60"]]
+        df.groupby(["Team", "Line"], dropna=False, observed=True)[["G60", "SOG60"]]
         .sum()
         .reset_index()
+        .astype({"Team": object, "Line": object})
     )
     line_agg["line_index"] = line_agg["G60"] + 0.1 * line_agg["SOG60"]
 
-    line_agg["mult"] = 1.0
-    for i, row in line_agg.iterrows():
-        team = row["Team"]
-        line_index = row["line_index"]
-        team_index = team_index_map.get(team, None)
-        if team_index is None or team_index <= 0:
-            mult = 1.0
-        else:
-            raw_ratio = line_index / team_index
-            mult = max(0.85, min(1.20, raw_ratio))
-        line_agg.at[i, "mult"] = mult
+    # One hash probe per line; ratio clipped to [0.85, 1.20], 1.0 if no baseline
+    team_index = line_agg["Team"].map(team_index_map)
+    ratio = (line_agg["line_index"] / team_index).clip(0.85, 1.20)
+    line_agg["mult"] = ratio.where(team_index > 0, 1.0).fillna(1.0)
 
-    mult_map = {}
-    for _, row in line_agg.iterrows():
-        key = (row["Team"], row["Line"])
-        mult_map[key] = row["mult"]
+    mult_map = dict(
+        zip(zip(line_agg["Team"], line_agg["Line"]), line_agg["mult"])
+    )
 
     return mult_map
 
@@ -381,28 +539,34 @@ def build_skaters(dk_df, nst_df, team_stats, lines_df, opp_map):
         print("No NST skater data; returning empty skater projections.")
         return pd.DataFrame()
 
-    df = nst_df.copy()
+    # No copy needed: merge/assign below always return a new frame
+    df = nst_df
 
     # Attach lines if available
     if lines_df is not None and not lines_df.empty:
-        lines_df = lines_df.copy()
-        lines_df["NormName"] = lines_df["NormName"].astype(str)
-        lines_df["Team"] = lines_df["Team"].astype(str).str.upper()
-        df = df.merge(
-            lines_df[["NormName", "Team", "Line"]],
-            on=["NormName", "Team"],
-            how="left",
+        line_keys = lines_df[["NormName", "Team", "Line"]].assign(
+            NormName=lines_df["NormName"].astype(str),
+            Team=lines_df["Team"].astype(str).str.upper(),
         )
+        line_keys = line_keys.drop_duplicates(["NormName", "Team"])
+        df = df.merge(line_keys, on=["NormName", "Team"], how="left")
     else:
-        df["Line"] = "NA"
+        df = df.assign(Line="NA")
 
     # Attach DK info if available
     if dk_df is not None and not dk_df.empty:
-        dk_df = dk_df.copy()
-        dk_df["NormName"] = dk_df["Player"].astype(str).apply(norm_name)
-        dk_df["Team"] = dk_df["Team"].astype(str).str.upper()
+        # load_dk_salaries already keys each row; only normalize if missing
+        if "NormName" in dk_df.columns:
+            dk_norm = dk_df["NormName"].astype(str)
+        else:
+            dk_norm = norm_names(dk_df["Player"])
+        dk_keys = dk_df[["Position", "Salary"]].assign(
+            NormName=dk_norm,
+            Team=dk_df["Team"].astype(str).str.upper(),
+        )
+        dk_keys = dk_keys.drop_duplicates(["NormName", "Team"])
         df = df.merge(
-            dk_df[["NormName", "Team", "Position", "Salary"]],
+            dk_keys[["NormName", "Team", "Position", "Salary"]],
             on=["NormName", "Team"],
             how="left",
             suffixes=("", "_DK"),
@@ -411,60 +575,52 @@ def build_skaters(dk_df, nst_df, team_stats, lines_df, opp_map):
         df["Position"] = df.get("Position", "F")
         df["Salary"] = pd.NA
 
-    # Default TOI per game for projection
-    df["TOI_per_game"] = df["TOI"].replace(0, 1e-6) / df["Games"].replace(0, 1.0)
-    df["TOI_per_game"] = df["TOI_per_game"].replace(
-        [float("inf"), -float("inf")], 15.0
-    ).fillna(15.0)
-
-    # Fill missing per 60 from fallbacks when necessary
-    for i, row in df.iterrows():
-        pos = row["Position"]
-        if pos not in ["D", "F"]:
-            pos = "F"
-        fb = FALLBACK_PER60[pos]
-        for stat, key in [
-            ("G60", "G60"),
-            ("A60", "A60"),
-            ("SOG60", "SOG60"),
-            ("BLK60", "BLK60"),
-        ]:
-            if pd.isna(row[stat]) or row[stat] == 0:
-                df.at[i, stat] = fb[key]
-
-    # Base game-level projections from per 60
-    df["Proj Goals"] = df["G60"] * df["TOI_per_game"] / 60.0
-    df["Proj Assists"] = df["A60"] * df["TOI_per_game"] / 60.0
-    df["Proj SOG"] = df["SOG60"] * df["TOI_per_game"] / 60.0
-    df["Proj Blocks"] = df["BLK60"] * df["TOI_per_game"] / 60.0
-
-    df["DK Points Base"] = (
-        df["Proj Goals"] * DK_WEIGHTS["goal"]
-        + df["Proj Assists"] * DK_WEIGHTS["assist"]
-        + df["Proj SOG"] * DK_WEIGHTS["shot"]
-        + df["Proj Blocks"] * DK_WEIGHTS["block"]
-    )
-
-    # Opponent
-    df["Opponent"] = df["Team"].map(opp_map) if opp_map else ""
+    # Projection arithmetic runs in float32: the per-60 inputs carry two
+    # or three significant digits, and half-width arrays halve the memory
+    # traffic. Default TOI per game is 15.0 where it can't be computed.
+    toi = df["TOI"].to_numpy(dtype=np.float32)
+    games = df["Games"].to_numpy(dtype=np.float32)
+    toi_per_game = np.where(toi == 0, 1e-6, toi) / np.where(games == 0, 1.0, games)
+    toi_per_game = np.where(np.isfinite(toi_per_game), toi_per_game, 15.0)
+
+    # Fill missing or zero per 60 from positional fallbacks, all four
+    # rate columns in one 2-D select (D row vs F row per player)
+    is_d = df["Position"].isin(["D"]).to_numpy()
+    rates = df[SKATER_RATE_COLS].to_numpy(dtype=np.float32)
+    fallback = np.where(is_d[:, None], FALLBACK_RATES_D, FALLBACK_RATES_F)
+    rates = np.where(np.isnan(rates) | (rates == 0), fallback, rates)
+
+    # Base game-level projections from per 60 (one NumPy pass over the rates)
+    proj = rates * (toi_per_game / 60.0)[:, None]
+
+    # All of the above lands in one assign: one batch of column inserts
+    # instead of a block rebuild per column
+    df = df.assign(**{
+        "TOI_per_game": toi_per_game,
+        **{c: rates[:, i] for i, c in enumerate(SKATER_RATE_COLS)},
+        "Proj Goals": proj[:, 0],
+        "Proj Assists": proj[:, 1],
+        "Proj SOG": proj[:, 2],
+        "Proj Blocks": proj[:, 3],
+        "DK Points Base": proj @ SKATER_RATE_WEIGHTS,
+        "Opponent": df["Team"].map(opp_map) if opp_map else "",
+    })
 
     # Line multipliers
-    line_mult_map = build_line_multipliers(df, team_stats)
-    df["Line_Mult"] = df.apply(
-        lambda r: line_mult_map.get((r["Team"], r["Line"]), 1.0), axis=1
+    # Reindex a (Team, Line)-keyed Series: one vectorized hash join in C
+    # instead of a Python dict probe per skater; unmatched keys get 1.0
+    line_mult = pd.Series(build_line_multipliers(df, team_stats), dtype=np.float32)
+    line_keys = pd.MultiIndex.from_arrays([df["Team"], df["Line"]])
+    line_mult = np.nan_to_num(line_mult.reindex(line_keys).to_numpy(), nan=1.0)
+    dk_points = df["DK Points Base"].to_numpy() * line_mult
+
+    # Value (only where Salary is present and positive)
+    salary = pd.to_numeric(df["Salary"], errors="coerce").to_numpy(
+        dtype=np.float32, na_value=np.nan
     )
-    df["DK Points"] = df["DK Points Base"] * df["Line_Mult"]
-
-    # Value (only if Salary is present)
-    if "Salary" in df.columns:
-        df["Value"] = df.apply(
-            lambda r: r["DK Points"] / (r["Salary"] / 1000.0)
-            if pd.notna(r["Salary"]) and r["Salary"] > 0
-            else pd.NA,
-            axis=1,
-        )
-    else:
-        df["Value"] = pd.NA
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = np.where(salary > 0, dk_points / (salary / 1000.0), np.nan)
+    df = df.assign(**{"Line_Mult": line_mult, "DK Points": dk_points, "Value": value})
 
     cols = [
         "Player",
@@ -502,36 +658,26 @@ def build_goalies(goalie_df, team_stats, opp_map):
         print("No goalie data; returning empty goalie projections.")
         return pd.DataFrame()
 
-    df = goalie_df.copy()
-    df["Opponent"] = df["Team"].map(opp_map) if opp_map else ""
-
-    team_stats = team_stats.copy()
-    idx = team_stats.set_index("Team")
-
-    def get_opp_shots(row):
-        opp = row["Opponent"]
-        if opp in idx.index:
-            return idx.loc[opp, "SF60"]
-        return FALLBACK_SF60
-
-    def get_team_xga(row):
-        tm = row["Team"]
-        if tm in idx.index:
-            return idx.loc[tm, "xGA60"]
-        return FALLBACK_xGA60
-
-    df["Opp_SF60"] = df.apply(get_opp_shots, axis=1)
-    df["Team_xGA60"] = df.apply(get_team_xga, axis=1)
-
-    df["Proj Shots Against"] = df["Opp_SF60"]
-    df["Proj Saves"] = df["Proj Shots Against"] * df["SV%"]
-    df["Proj GA"] = df["Proj Shots Against"] * (1.0 - df["SV%"])
-
-    df["DK Points"] = (
-        df["Proj Saves"] * 0.7
-        - df["Proj GA"] * 3.5
+    # Only the columns the projection needs; no copy of the raw goalie frame
+    df = goalie_df[["Player", "Team", "SV%"]].assign(
+        Opponent=goalie_df["Team"].map(opp_map) if opp_map else ""
     )
 
+    # Team -> SF60 lookup built once; one hash probe per goalie
+    sf60_by_team = dict(zip(team_stats["Team"], team_stats["SF60"]))
+    shots = df["Opponent"].map(sf60_by_team).fillna(FALLBACK_SF60).to_numpy(dtype=float)
+    sv = df["SV%"].fillna(LEAGUE_AVG_SV).to_numpy(dtype=float)
+
+    # Plain array math, assigned once; no intermediate Series per stat
+    saves = shots * sv
+    goals_against = shots * (1.0 - sv)
+    df = df.assign(**{
+        "Proj Shots Against": shots,
+        "Proj Saves": saves,
+        "Proj GA": goals_against,
+        "DK Points": saves * DK_WEIGHTS["save"] - goals_against * DK_WEIGHTS["goal_against"],
+    })
+
     cols = [
         "Player",
         "Team",
@@ -557,71 +703,132 @@ def build_stacks(dfs_proj):
         print("No skater projections; returning empty stacks.")
         return pd.DataFrame()
 
-    df = dfs_proj.copy()
-    if "Line" not in df.columns:
-        df["Line"] = "NA"
+    # Only the five columns stacks use (missing ones come back as NA),
+    # rather than a copy of the full projection frame
+    df = dfs_proj.reindex(columns=["Player", "Team", "Line", "DK Points", "Salary"])
     df["Line"] = df["Line"].fillna("NA")
 
-    for col in ["DK Points", "Salary"]:
-        if col not in df.columns:
-            df[col] = pd.NA
-
-    grouped = df.groupby(["Team", "Line"], dropna=False)
-
-    stack_rows = []
-    for (team, line), sub in grouped:
-        players = ", ".join(sub["Player"].astype(str).tolist())
-        stack_dk = sub["DK Points"].sum(skipna=True)
-        stack_salary = sub["Salary"].sum(skipna=True) if "Salary" in sub.columns else pd.NA
-        if pd.isna(stack_salary) or stack_salary <= 0:
-            stack_value = pd.NA
-        else:
-            stack_value = stack_dk / (stack_salary / 1000.0)
-
-        stack_rows.append(
-            {
-                "Team": team,
-                "Line": line,
-                "Players": players,
-                "Stack_DK_Points": stack_dk,
-                "Stack_Salary": stack_salary,
-                "Stack_Value": stack_value,
-            }
+    df["Salary"] = pd.to_numeric(df["Salary"], errors="coerce")
+    df["DK Points"] = pd.to_numeric(df["DK Points"], errors="coerce")
+
+    # One groupby/agg pass instead of a Python loop over groups. Categorical
+    # keys hash once per unique code; observed=True skips empty Team x Line pairs.
+    df = df.astype({"Player": str, "Team": "category", "Line": "category"})
+    # Highest-projected skater first within each stack's Players string
+    df = df.sort_values("DK Points", ascending=False, kind="stable")
+    stack_df = (
+        df.groupby(["Team", "Line"], dropna=False, observed=True)
+        .agg(
+            Players=("Player", ", ".join),
+            Stack_DK_Points=("DK Points", "sum"),
+            Stack_Salary=("Salary", "sum"),
         )
+        .reset_index()
+        .astype({"Team": str, "Line": str})
+    )
+    stack_df["Stack_Value"] = (
+        stack_df["Stack_DK_Points"] / (stack_df["Stack_Salary"] / 1000.0)
+    ).where(stack_df["Stack_Salary"] > 0)
 
-    stack_df = pd.DataFrame(stack_rows)
     if not stack_df.empty:
         stack_df = stack_df.sort_values("Stack_DK_Points", ascending=False)
 
     return stack_df
 
 # -------------------------------------------------------------------
-# MAIN
+# OUTPUTS
 # -------------------------------------------------------------------
 
-def main():
-    print("Starting projections...")
-
-    # 1) Schedule + Opponent map
-    schedule_df = get_today_schedule()
-    opp_map = build_opp_map(schedule_df)
-    print("Schedule rows: " + str(len(schedule_df)))
-    print("Opp map size: " + str(len(opp_map)))
+def write_outputs(tabs):
+    """Projection CSVs (+ Parquet); the remaining tabs as Parquet only."""
+    save_output(tabs["Skaters"], "dfs_projections")
+    save_output(tabs["Goalies"], "goalie_projections")
+    save_output(tabs["Stacks"], "stack_projections")
+    save_parquet(tabs["Teams"], "team_stats")
+    save_parquet(tabs["NST_Raw"], "nst_raw")
+    save_parquet(tabs["ADP_View"], "adp_view")
+
+def export_excel(output_path, tabs):
+    """One sheet per non-empty tab, in tab order."""
+    import xlsxwriter
+
+    print("Exporting to Excel...")
+    # xlsxwriter streams rows to disk (constant_memory) instead of
+    # building the whole workbook in memory like openpyxl. That mode only
+    # keeps the current row, and DataFrame.to_excel emits cells column by
+    # column (later columns lose every row but the last), so write each
+    # frame row by row ourselves. Player/team text never holds links or
+    # formulas, so skip those per-cell checks.
+    workbook = xlsxwriter.Workbook(
+        output_path,
+        {
+            "constant_memory": True,
+            "strings_to_urls": False,
+            "strings_to_formulas": False,
+            "nan_inf_to_errors": True,
+            "default_date_format": "yyyy-mm-dd hh:mm:ss",
+        },
+    )
+    header_format = workbook.add_format(
+        {"bold": True, "border": 1, "align": "center", "valign": "top"}
+    )
+    try:
+        for sheet_name, df in tabs.items():
+            if df is None or df.empty:
+                continue
+            worksheet = workbook.add_worksheet(sheet_name)
+            worksheet.write_row(0, 0, [str(c) for c in df.columns], header_format)
+            # Missing values become None, which xlsxwriter leaves blank;
+            # float32 columns are widened via their short repr first
+            df = float32_as_float64(df)
+            values = df.astype(object).where(df.notna(), None)
+            for row_num, row in enumerate(values.itertuples(index=False, name=None), start=1):
+                worksheet.write_row(row_num, 0, row)
+    finally:
+        workbook.close()
+    print("Excel ready: " + str(output_path))
 
-    # 2) NST team stats
-    team_stats_raw = nst_scraper.get_team_stats(CURR_SEASON)
-    team_stats = normalize_nst_team_stats(team_stats_raw)
-    print("Team stats rows: " + str(len(team_stats)))
+# -------------------------------------------------------------------
+# MAIN
+# -------------------------------------------------------------------
 
-    # 3) NST skaters
-    print("Fetching NST skater stats for all teams (stub)...")
+def fetch_nst_inputs(nst_teams, teams_today):
+    """
+    Scrape the per-team NST skater pages, the goalie table and today's
+    lines. Returns (raw skater frame, raw goalie frame, lines frame).
+    """
+    print("Fetching NST skater stats for " + str(len(nst_teams)) + " teams (stub)...")
+    # Per-team scrapes are network-bound; a small pool overlaps them while
+    # the scraper's per-host throttle keeps NST request spacing. The goalie
+    # pull and the lines fetch go into the same pool so they overlap too.
     nst_players_list = []
-    for team in team_stats["Team"].unique():
-        try:
-            nst_players_list.append(nst_scraper.get_team_players(team, CURR_SEASON))
-        except Exception as e:
-            print("NST skater fetch failed for " + str(team) + ": " + str(e))
-
+    with ThreadPoolExecutor(max_workers=NST_MAX_WORKERS) as executor:
+        goalie_job = executor.submit(
+            daily_cached,
+            "nst_goalies_" + CURR_SEASON,
+            partial(nst_scraper.get_goalies, CURR_SEASON),
+        )
+        lines_job = executor.submit(get_all_lines, teams_today)
+        futures = [
+            (
+                team,
+                executor.submit(
+                    daily_cached,
+                    "nst_players_" + str(team) + "_" + CURR_SEASON,
+                    partial(nst_scraper.get_team_players, team, CURR_SEASON),
+                ),
+            )
+            for team in nst_teams
+        ]
+        for team, future in futures:
+            try:
+                nst_players_list.append(future.result())
+            except Exception as e:
+                print("NST skater fetch failed for " + str(team) + ": " + str(e))
+
+    # One concat over the non-empty team frames only: empty ones add no
+    # rows but would force column unions and object upcasts
+    nst_players_list = [df for df in nst_players_list if df is not None and not df.empty]
     if nst_players_list:
         try:
             nst_df_raw = pd.concat(nst_players_list, ignore_index=True)
@@ -629,16 +836,63 @@ def main():
             nst_df_raw = pd.DataFrame()
     else:
         nst_df_raw = pd.DataFrame()
+    return nst_df_raw, goalie_job.result(), lines_job.result()
+
+
+def main(export_xlsx=None):
+    """
+    Run the daily pipeline. export_xlsx forces the Excel workbook on or
+    off; None defers to EXPORT_XLSX.
+    """
+    print("Starting projections...")
+    if export_xlsx is None:
+        export_xlsx = export_xlsx_enabled()
+
+    # 1-2) Schedule and NST team stats are independent fetches; the team
+    #      table downloads while the schedule is read
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        team_stats_job = executor.submit(
+            daily_cached,
+            "nst_team_stats_" + CURR_SEASON,
+            partial(nst_scraper.get_team_stats, CURR_SEASON),
+        )
+
+        # 1) Schedule + Opponent map (the slate is fixed for the day)
+        schedule_df = daily_cached("schedule", get_today_schedule)
+        teams_today = schedule_teams(schedule_df)
+        opp_map = build_opp_map(schedule_df)
+        print("Schedule rows: " + str(len(schedule_df)))
+        print("Teams today: " + str(len(teams_today)))
+        print("Opp map size: " + str(len(opp_map)))
+
+        # 2) NST team stats
+        team_stats_raw = team_stats_job.result()
+    team_stats = normalize_nst_team_stats(team_stats_raw)
+    print("Team stats rows: " + str(len(team_stats)))
+
+    # 3) NST skaters
+    # Only teams playing today when a schedule is available. Both branches
+    # give a sorted, de-duplicated array, so fetch order is stable.
+    if len(teams_today):
+        nst_teams = teams_today
+    else:
+        nst_teams = np.unique(team_stats["Team"].to_numpy(dtype=str))
+    if len(nst_teams):
+        nst_df_raw, goalie_raw, lines_df = fetch_nst_inputs(nst_teams, teams_today)
+    else:
+        # No slate and no team baseline: skip the skater/goalie scrapes but
+        # still run through to the writes below, so yesterday's outputs are
+        # replaced by empty ones instead of lingering as if current
+        print("No teams to project; skipping NST fetches.")
+        nst_df_raw, goalie_raw, lines_df = pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
     nst_df = normalize_nst_skaters(nst_df_raw)
     print("NST skaters rows: " + str(len(nst_df)))
 
     # 4) NST goalies
-    goalie_df_raw = nst_scraper.get_goalies(CURR_SEASON)
-    goalie_df = normalize_goalie_stats(goalie_df_raw)
+    goalie_df = normalize_goalie_stats(goalie_raw)
     print("NST goalies rows: " + str(len(goalie_df)))
 
     # 5) Lines
-    lines_df = get_all_lines(schedule_df)
     print("Lines rows: " + str(len(lines_df)))
 
     # 6) DK salaries (optional)
@@ -660,12 +914,7 @@ def main():
     stack_proj = build_stacks(dfs_proj)
     print("Stacks rows: " + str(len(stack_proj)))
 
-    # 8) Save to CSV
-    dfs_proj.to_csv(os.path.join(DATA_DIR, "dfs_projections.csv"), index=False)
-    goalie_proj.to_csv(os.path.join(DATA_DIR, "goalie_projections.csv"), index=False)
-    stack_proj.to_csv(os.path.join(DATA_DIR, "stack_projections.csv"), index=False)
-
-    # 9) ADP-style view
+    # 8) ADP-style view
     adp_df = dfs_proj.copy()
     if not adp_df.empty and "DK Points" in adp_df.columns:
         adp_df["Rank"] = adp_df["DK Points"].rank(ascending=False, method="min")
@@ -687,40 +936,56 @@ def main():
         cols = [c for c in cols if c in adp_df.columns]
         adp_df = adp_df[cols].sort_values("Rank")
 
-    # 10) Excel export
-    try:
-        print("Exporting to Excel...")
-        output_path = os.path.join(
-            DATA_DIR, "projections_" + datetime.today().strftime("%Y%m%d") + ".xlsx"
-        )
-        with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-            dfs_proj.to_excel(writer, sheet_name="Skaters", index=False)
-            goalie_proj.to_excel(writer, sheet_name="Goalies", index=False)
-            stack_proj.to_excel(writer, sheet_name="Stacks", index=False)
-            team_stats.to_excel(writer, sheet_name="Teams", index=False)
-            nst_df.to_excel(writer, sheet_name="NST_Raw", index=False)
-            if not adp_df.empty:
-                adp_df.to_excel(writer, sheet_name="ADP_View", index=False)
-        print("Excel ready: " + str(output_path))
-    except Exception as e:
-        print("Excel export failed: " + str(e))
+    tabs = {
+        "Skaters": dfs_proj,
+        "Goalies": goalie_proj,
+        "Stacks": stack_proj,
+        "Teams": team_stats,
+        "NST_Raw": nst_df,
+        "ADP_View": adp_df,
+    }
 
-    # 11) Optional Sheets export
-    try:
-        tabs = {
-            "Skaters": dfs_proj,
-            "Goalies": goalie_proj,
-            "Stacks": stack_proj,
-            "Teams": team_stats,
-            "NST_Raw": nst_df,
-        }
-        if not adp_df.empty:
-            tabs["ADP_View"] = adp_df
-        upload_to_sheets("NHL Projections", tabs)
-    except Exception as e:
-        print("Sheets upload failed: " + str(e))
+    # 9-11) Sheets upload, local files and the Excel workbook are
+    #       independent I/O; run them side by side and wait for all three.
+    #       Files and Sheets always get every tab, empty ones included, so
+    #       a day with nothing to project overwrites the previous outputs
+    #       (Sheets shows "(no rows)") instead of leaving them stale. The
+    #       Excel workbook is only built when there are skater projections,
+    #       and leaves out the NST_Raw debug dump (it stays in Sheets and
+    #       data/nst_raw.parquet).
+    excel_tabs = {name: df for name, df in tabs.items() if name not in EXCEL_SKIP_TABS}
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        jobs = [
+            ("File writes", executor.submit(write_outputs, tabs)),
+            ("Sheets upload", executor.submit(upload_to_sheets, "NHL Projections", tabs)),
+        ]
+        if dfs_proj.empty:
+            print("No skater projections; skipping Excel export.")
+        elif export_xlsx:
+            output_path = os.path.join(
+                DATA_DIR, "projections_" + datetime.today().strftime("%Y%m%d") + ".xlsx"
+            )
+            jobs.append(("Excel export", executor.submit(export_excel, output_path, excel_tabs)))
+        else:
+            print("Excel export skipped (pass --excel or set EXPORT_XLSX=1 to enable).")
+
+        # 12) Wait for everything to finish
+        for label, future in jobs:
+            try:
+                future.result()
+            except Exception as e:
+                print(label + " failed: " + str(e))
 
     print("Done.")
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Daily NHL DFS projections.")
+    parser.add_argument(
+        "--excel",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="also build data/projections_YYYYMMDD.xlsx (default: EXPORT_XLSX env)",
+    )
+    main(export_xlsx=parser.parse_args().excel)
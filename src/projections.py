@@ -1,3 +1,6 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 import numpy as np
 
@@ -6,40 +9,57 @@ import numpy as np
 ########################################
 
 def add_player_rate_stats(nst_player_totals_df):
-    df = nst_player_totals_df.copy()
+    df = nst_player_totals_df
 
     # Make sure TOI is not zero
-    df["TOI"] = df["TOI"].replace(0, np.)
-    df["TOI_PP"] = df.get("TOI_PP", 0).replace(0, np.)
+    toi = df["TOI"].replace(0, np.nan)
+    if "TOI_PP" in df.columns:
+        toi_pp = df["TOI_PP"].replace(0, np.nan)
+    else:
+        toi_pp = pd.Series(np.nan, index=df.index)
 
+    # Every per-60 rate is one 2-D NumPy division (stats x TOI column),
+    # and all new columns land in a single assign
     base_cols = ["CF", "CA", "SF", "SA", "xGF", "xGA"]
-    for col in base_cols:
-        df[col + "_60"] = (df[col] / df["TOI"]) * 60
+    totals = df[base_cols].to_numpy(dtype=float, na_value=np.nan)
+    per60 = totals / toi.to_numpy(dtype=float, na_value=np.nan)[:, None] * 60
+    pp60 = totals / toi_pp.to_numpy(dtype=float, na_value=np.nan)[:, None] * 60
+
+    new_cols = {"TOI": toi, "TOI_PP": toi_pp}
+    new_cols.update({col + "_60": per60[:, i] for i, col in enumerate(base_cols)})
 
     # Offensive base rates
-    df["CF_off60"] = df["CF_60"]
-    df["SF_off60"] = df["SF_60"]
-    df["xGF_off60"] = df["xGF_60"]
+    new_cols["CF_off60"] = new_cols["CF_60"]
+    new_cols["SF_off60"] = new_cols["SF_60"]
+    new_cols["xGF_off60"] = new_cols["xGF_60"]
 
     # Power play per-60
-    if "TOI_PP" in df.columns:
-        for col in base_cols:
-            df[col + "_PP60"] = (df[col] / df["TOI_PP"]) * 60
+    new_cols.update({col + "_PP60": pp60[:, i] for i, col in enumerate(base_cols)})
 
     # Time on ice per game
-    df["TOI_per_game"] = df["TOI"] / df["GP"]
+    new_cols["TOI_per_game"] = toi / df["GP"]
 
-    return df
+    return df.assign(**new_cols)
 
 
 ########################################
 # 2. LINE CONTEXT (DFO + NST lines)
 ########################################
 
+def _line_key(df):
+    # Team + "_" + LineType via Arrow's string kernels (no per-row Python)
+    return (
+        df["Team"].astype("string[pyarrow]")
+        + "_"
+        + df["LineType"].astype("string[pyarrow]")
+    )
+
+
 def build_line_context(player_rates_df, dfo_lines_df, nst_line_stats_df):
-    df = player_rates_df.copy()
-    dfo = dfo_lines_df.copy()
-    lines = nst_line_stats_df.copy()
+    # Inputs are only read (column slices, merges); no defensive copies
+    df = player_rates_df
+    dfo = dfo_lines_df
+    lines = nst_line_stats_df
 
     # Use NormName everywhere if you have it, fall back to Player
     if "NormName" in dfo.columns and "NormName" in df.columns:
@@ -70,18 +90,20 @@ def build_line_context(player_rates_df, dfo_lines_df, nst_line_stats_df):
 
     # Quick-and-dirty line key (Team + LineType) to join with NST line stats
     if "Team" in lines.columns and "LineType" in lines.columns:
-        lines["LineKey"] = lines["Team"] + "_" + lines["LineType"]
-        df["LineKey"] = df["Team"] + "_" + df["LineType"]
+        df["LineKey"] = _line_key(df)
 
         line_cols = [
-            "LineKey",
             "Line_TOI",
             "Line_CF60",
             "Line_xGF60",
             "Line_SF60"
         ]
         # Expect these in nst_line_stats_df; if not, adjust names there once
-        lines_small = lines[line_cols].drop_duplicates()
+        lines_small = (
+            lines[line_cols]
+            .assign(LineKey=_line_key(lines))[["LineKey"] + line_cols]
+            .drop_duplicates()
+        )
 
         df = df.merge(
             lines_small,
@@ -89,10 +111,10 @@ def build_line_context(player_rates_df, dfo_lines_df, nst_line_stats_df):
             on="LineKey"
         )
     else:
-        df["Line_TOI"] = np.
-        df["Line_CF60"] = np.
-        df["Line_xGF60"] = np.
-        df["Line_SF60"] = np.
+        df["Line_TOI"] = np.nan
+        df["Line_CF60"] = np.nan
+        df["Line_xGF60"] = np.nan
+        df["Line_SF60"] = np.nan
 
     return df
 
@@ -102,16 +124,15 @@ def build_line_context(player_rates_df, dfo_lines_df, nst_line_stats_df):
 ########################################
 
 def add_opponent_context(df, team_stats_df):
-    sk = df.copy()
-    teams = team_stats_df.copy()
+    sk = df
 
     # Expect columns like: Team, CF60, CA60, xGF60, xGA60
     # We will merge opponent stats in
     if "Opponent" not in sk.columns:
         # If you don't have Opponent yet, you can skip or set dummy for now
-        sk["Opponent"] = sk["Team"]
+        sk = sk.assign(Opponent=sk["Team"])
 
-    opp = teams.rename(columns={
+    opp = team_stats_df.rename(columns={
         "Team": "Opponent",
         "CF60": "Opp_CF60",
         "CA60": "Opp_CA60",
@@ -227,7 +248,7 @@ def merge_dk_salaries(skater_proj_df, dk_salaries_df):
     if "Salary" in sk.columns:
         sk["Value"] = sk["Projection"] / (sk["Salary"] / 1000.0)
     else:
-        sk["Value"] = np.
+        sk["Value"] = np.nan
 
     return sk
 
@@ -262,6 +283,31 @@ def build_adp_rankings(skater_proj_df):
 # 7. WRITE OUTPUTS (CSV + EXCEL)
 ########################################
 
+def _write_csv_and_parquet(df, csv_path):
+    # CSV for people; a typed .parquet sibling for fast downstream reads
+    df.to_csv(csv_path, index=False)
+    parquet_path = os.path.splitext(csv_path)[0] + ".parquet"
+    try:
+        df.to_parquet(parquet_path, engine="pyarrow", compression="zstd", index=False)
+    except ImportError:
+        pass
+
+
+def _write_excel(excel_path, sheets):
+    # No constant_memory: to_excel writes column by column, which that
+    # mode can't take. Skipping the per-cell URL/formula sniffing still
+    # trims the write.
+    options = {
+        "strings_to_urls": False,
+        "strings_to_formulas": False,
+    }
+    with pd.ExcelWriter(
+        excel_path, engine="xlsxwriter", engine_kwargs={"options": options}
+    ) as writer:
+        for sheet_name, df in sheets.items():
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+
 def write_projection_outputs(
     skater_proj_df,
     goalie_proj_df,
@@ -270,8 +316,6 @@ def write_projection_outputs(
     team_stats_df,
     base_path="data/outputs"
 ):
-    import os
-
     os.makedirs(base_path, exist_ok=True)
 
     skater_csv = os.path.join(base_path, "skater_projections.csv")
@@ -281,15 +325,22 @@ def write_projection_outputs(
     team_csv = os.path.join(base_path, "team_stats.csv")
     excel_path = os.path.join(base_path, "nhl_projections_full.xlsx")
 
-    skater_proj_df.to_csv(skater_csv, index=False)
-    goalie_proj_df.to_csv(goalie_csv, index=False)
-    adp_df.to_csv(adp_csv, index=False)
-    lines_df.to_csv(lines_csv, index=False)
-    team_stats_df.to_csv(team_csv, index=False)
-
-    with pd.ExcelWriter(excel_path, engine="xlsxwriter") as writer:
-        skater_proj_df.to_excel(writer, sheet_name="SkaterProjections", index=False)
-        goalie_proj_df.to_excel(writer, sheet_name="GoalieProjections", index=False)
-        adp_df.to_excel(writer, sheet_name="ADP", index=False)
-        lines_df.to_excel(writer, sheet_name="Lines", index=False)
-        team_stats_df.to_excel(writer, sheet_name="TeamStats", index=False)
+    sheets = {
+        "SkaterProjections": skater_proj_df,
+        "GoalieProjections": goalie_proj_df,
+        "ADP": adp_df,
+        "Lines": lines_df,
+        "TeamStats": team_stats_df,
+    }
+
+    # The workbook and the flat files only read the frames, so build the
+    # workbook in the background while the CSV/parquet files are written;
+    # result() re-raises any Excel error here.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        excel_job = executor.submit(_write_excel, excel_path, sheets)
+        _write_csv_and_parquet(skater_proj_df, skater_csv)
+        _write_csv_and_parquet(goalie_proj_df, goalie_csv)
+        _write_csv_and_parquet(adp_df, adp_csv)
+        _write_csv_and_parquet(lines_df, lines_csv)
+        _write_csv_and_parquet(team_stats_df, team_csv)
+        excel_job.result()
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+from adp_nhl.utils import common
+
+# ---------------------------- HELPERS ----------------------------
+class FakeResponse:
+    def __init__(self, status_code, headers=None, text=""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+def _an_hour_out():
+    return format_datetime(datetime.now(timezone.utc) + timedelta(hours=1), usegmt=True)
+
+# ---------------------------- RETRY-AFTER ----------------------------
+@pytest.mark.parametrize("header", ["3600", None])
+def test_http_get_cached_caps_retry_after(monkeypatch, tmp_path, header):
+    """A 429 asking for an hour (delta seconds or HTTP date) waits at most 60s."""
+    value = header or _an_hour_out()
+    responses = iter([FakeResponse(429, {"Retry-After": value}), FakeResponse(200, text="ok")])
+    sleeps = []
+    monkeypatch.setattr(common.SESSION, "get", lambda *a, **k: next(responses))
+    monkeypatch.setattr(common.time, "sleep", sleeps.append)
+
+    html = common.http_get_cached("https://example.test/p", "t", cache_dir=str(tmp_path), sleep=0)
+    assert html == "ok"
+    assert sleeps == [common.MAX_RETRY_AFTER]
+
+@pytest.mark.parametrize("header", ["3600", None])
+def test_session_retry_caps_retry_after(header):
+    """Transport retries honor Retry-After only up to backoff_max."""
+    value = header or _an_hour_out()
+    retry = common.SESSION.get_adapter("https://").max_retries
+    assert retry.get_retry_after(FakeResponse(429, {"Retry-After": value})) == retry.backoff_max
+    assert retry.get_retry_after(FakeResponse(429, {"Retry-After": "2"})) == 2
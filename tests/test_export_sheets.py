@@ -0,0 +1,15 @@
+import numpy as np
+import pandas as pd
+from adp_nhl.utils import export_sheets
+
+# ---------------------------- SHEET VALUES ----------------------------
+def test_sheet_values_float32_clean():
+    """float32 cells are sent as their short decimal, not the widened float64."""
+    df = pd.DataFrame({
+        "Player": ["A", "B", "C"],
+        "DK Points": np.array([12.672, np.nan, np.inf], dtype=np.float32),
+        "Salary": [5000, 4200, 3100],
+    })
+    rows = export_sheets._sheet_values(df)
+    assert rows == [["A", 12.672, 5000], ["B", "", 4200], ["C", "", 3100]]
+    assert type(rows[0][1]) is float
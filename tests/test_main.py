@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+import main
+
+# ---------------------------- EXCEL EXPORT ----------------------------
+def test_export_excel_keeps_every_cell(tmp_path):
+    """Streaming (constant_memory) export keeps every cell; float32 values stay clean."""
+    df = pd.DataFrame({
+        "a": [1, 2, 3],
+        "b": ["x", None, "z"],
+        "c": [0.5, 1.5, 2.5],
+        "d": np.array([12.672, 0.8, np.nan], dtype=np.float32),
+    })
+    path = tmp_path / "out.xlsx"
+    main.export_excel(path, {"Skaters": df, "Empty": pd.DataFrame()})
+    sheets = pd.read_excel(path, sheet_name=None)
+    assert list(sheets) == ["Skaters"]
+    out = sheets["Skaters"]
+    assert list(out["a"]) == [1, 2, 3]
+    assert out.loc[0, "b"] == "x" and pd.isna(out.loc[1, "b"]) and out.loc[2, "b"] == "z"
+    assert list(out["c"]) == [0.5, 1.5, 2.5]
+    # float32 cells keep their short decimal, not the widened float64
+    assert out.loc[0, "d"] == 12.672 and out.loc[1, "d"] == 0.8 and pd.isna(out.loc[2, "d"])
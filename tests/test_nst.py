@@ -18,6 +18,53 @@ def test_blend_three_layer_missing():
     # only 2.0 with weight 0.35 → should equal 2.0
     assert abs(result - 2.0) < 1e-6
 
+def test_blend_three_layer_cols_matches_scalar():
+    """Vectorized blend agrees with the scalar version row by row."""
+    recent = pd.Series([1.0, None, None, 4.0])
+    season = pd.Series([2.0, 2.0, None, None])
+    last = pd.Series([3.0, None, None, 1.0])
+    out = nst.blend_three_layer_cols(recent, season, last)
+    for i in range(len(out)):
+        expected = nst.blend_three_layer(recent[i], season[i], last[i])
+        if expected is None:
+            assert pd.isna(out[i])
+        else:
+            assert abs(out[i] - expected) < 1e-9
+
+# ---------------------------- TABLE PARSING ----------------------------
+PLAYER_TABLE_HTML = """
+<table><thead><tr><th></th><th>Player</th><th>Team</th><th>G/60</th><th>Total Assists/60</th><th>Shots/60</th></tr></thead>
+<tbody>
+<tr><td>1</td><td><a href="playerreport.php?id=1">David Pastrnak</a></td><td>BOS</td><td>1.5</td><td>2.0</td><td>10.1</td></tr>
+<tr><td>2</td><td>Brad Marchand</td><td>BOS</td><td>-</td><td>1.0</td><td>7.1</td></tr>
+</tbody></table>
+"""
+
+def test_parse_nst_player_rows_table():
+    """Player table is parsed in one pass with header variants mapped."""
+    df = nst._parse_nst_player_rows(PLAYER_TABLE_HTML)
+    assert list(df["PlayerRaw"]) == ["David Pastrnak", "Brad Marchand"]
+    assert df.loc[0, "A/60"] == 2.0
+    assert df.loc[1, "SOG/60"] == 7.1
+    assert pd.isna(df.loc[1, "G/60"])
+    assert df["BLK/60"].isna().all()
+
+TD_HEADER_TABLE_HTML = """
+<table><tr><td></td><td>Player</td><td>G/60</td><td>Shots/60</td></tr>
+<tr><td>1</td><td><a href="playerreport.php?id=1">David Pastrnak</a></td><td>1.5</td><td>10.1</td></tr>
+<tr><td>2</td><td>Brad Marchand</td><td>-</td><td>7.1</td></tr>
+</table>
+"""
+
+def test_parse_nst_player_rows_td_header():
+    """A header row of <td>s is still read by column via the lxml walk."""
+    df = nst._parse_nst_player_rows(TD_HEADER_TABLE_HTML)
+    assert list(df["PlayerRaw"]) == ["David Pastrnak", "Brad Marchand"]
+    assert df.loc[0, "G/60"] == 1.5
+    assert df.loc[1, "SOG/60"] == 7.1
+    assert pd.isna(df.loc[1, "G/60"])
+    assert df["A/60"].isna().all()
+
 # ---------------------------- TEAM STATS ----------------------------
 def test_get_team_stats_returns_df():
     df = nst.get_team_stats()